@@ -1,22 +1,9 @@
 import os
-import json
-import pandas as pd
 import matplotlib.pyplot as plt
-import sqlite3
-from datetime import datetime
+from analysis.metrics_reader import MetricsReader
 
-# Create the output directory for graphs
+# Output directory for graphs, created when the first graph is saved
 GRAPH_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "output", "graphs")
-os.makedirs(GRAPH_DIR, exist_ok=True)
-
-
-def parse_json_column(column):
-    if isinstance(column, str):
-        try:
-            return json.loads(column.replace("'", '"'))
-        except Exception:
-            return []
-    return column
 
 
 def compute_growth(series):
@@ -31,75 +18,68 @@ def compute_growth(series):
     return growth
 
 
-def analyze_metrics(df):
-    df['monthly_visits'] = df['monthly_visits'].apply(parse_json_column)
-    df['rank_changes'] = df['rank_changes'].apply(parse_json_column)
-
-    site_growth = []
-    for _, row in df.iterrows():
-        filename = row['filename']
-
-        # VISITS GROWTH
-        months = []
-        visits = []
-        for v in row['monthly_visits']:
-            if isinstance(v, dict) and 'visits' in v and 'month' in v:
-                months.append(v['month'])
-                visits.append(v['visits'])
-
-        visit_growth = compute_growth(visits)
-
-        if visit_growth:
-            plt.figure()
-            plt.plot(months[1:], visit_growth, marker='o')
-            plt.title(f"Month-on-Month Growth in Visits ({filename})")
-            plt.xlabel("Month")
-            plt.ylabel("Growth (%)")
-            plt.grid(True)
-            plt.savefig(os.path.join(GRAPH_DIR, f"visits_growth_{filename.replace('.html', '')}.png"))
-            plt.close()
-
-        # RANK GROWTH
-
-        months = []
-        ranks = []
-        for v in row['rank_changes']:
-            if isinstance(v, dict) and 'rank' in v and 'month' in v:
-                months.append(v['month'])
-                ranks.append(v['rank'])
-
-        rank_growth = compute_growth(ranks)
-
-        if rank_growth:
-            plt.figure()
-            plt.plot(months[1:], rank_growth, marker='o', color='orange')
-            plt.title(f"Month-on-Month Growth in Rank ({filename})")
-            plt.xlabel("Month")
-            plt.ylabel("Growth (%)")
-            plt.grid(True)
-            plt.savefig(os.path.join(GRAPH_DIR, f"rank_growth_{filename.replace('.html', '')}.png"))
-            plt.close()
-
-        # Store average growth for comparison
-        avg_visit = sum(v for v in visit_growth if v is not None) / len(visit_growth) if visit_growth else 0
-        avg_rank = sum(v for v in rank_growth if v is not None) / len(rank_growth) if rank_growth else 0
-        score = avg_visit - avg_rank  # Better if visits up and rank down
-        site_growth.append({"site": filename, "score": round(score, 2)})
-
-    # RELATIVE RANKING
-    site_growth = sorted(site_growth, key=lambda x: x['score'], reverse=True)
+def plot_growth(filename, months, growth, metric):
+    """Saves a month-on-month growth chart for one site ('visits' or 'rank')."""
+    plt.figure()
+    if metric == "visits":
+        plt.plot(months, growth, marker='o')
+        plt.title(f"Month-on-Month Growth in Visits ({filename})")
+    else:
+        plt.plot(months, growth, marker='o', color='orange')
+        plt.title(f"Month-on-Month Growth in Rank ({filename})")
+    plt.xlabel("Month")
+    plt.ylabel("Growth (%)")
+    plt.grid(True)
+    os.makedirs(GRAPH_DIR, exist_ok=True)
+    plt.savefig(os.path.join(GRAPH_DIR, f"{metric}_growth_{filename.replace('.html', '')}.png"))
+    plt.close()
+
+
+def plot_relative_ranking(site_growth):
+    """Saves the relative growth ranking bar chart; expects entries sorted best first."""
+    if not site_growth:
+        return
+
     sites = [x['site'] for x in site_growth]
     scores = [x['score'] for x in site_growth]
 
-    if site_growth:
-        plt.figure(figsize=(10, 6))
-        plt.barh(sites, scores, color='green')
-        plt.xlabel("Relative Growth Score")
-        plt.title("Site Ranking by Combined Growth (Visits ↑ and Rank ↓)")
-        plt.gca().invert_yaxis()
-        plt.tight_layout()
-        plt.savefig(os.path.join(GRAPH_DIR, "relative_growth_ranking.png"))
-        plt.close()
+    plt.figure(figsize=(10, 6))
+    plt.barh(sites, scores, color='green')
+    plt.xlabel("Relative Growth Score")
+    plt.title("Site Ranking by Combined Growth (Visits ↑ and Rank ↓)")
+    plt.gca().invert_yaxis()
+    plt.tight_layout()
+    os.makedirs(GRAPH_DIR, exist_ok=True)
+    plt.savefig(os.path.join(GRAPH_DIR, "relative_growth_ranking.png"))
+    plt.close()
+
+
+def analyze_metrics_from_db(db_path, k=10):
+    """
+    Saves the growth graphs and the relative ranking, read from the pre-aggregated summary tables
+    instead of loading and decoding the whole web_metrics table.
+    Only the top and bottom k movers are plotted; both come from the score index, so
+    the full ranking is never recomputed or sorted here.
+    db_path may also be a shard directory written by etl.shards, read through federated views.
+    """
+    if os.path.isdir(db_path):
+        from etl.shards import ShardedMetricsReader
+        reader = ShardedMetricsReader(db_path)
+    else:
+        reader = MetricsReader(db_path)
+
+    top = reader.read_top(k)
+    top_sites = {entry["site"] for entry in top}
+    bottom = [entry for entry in reversed(reader.read_top(k, bottom=True)) if entry["site"] not in top_sites]
+    movers = top + bottom
+
+    for filename, series in reader.read_growth([entry["site"] for entry in movers]).items():
+        for metric in ("visits", "rank"):
+            if metric in series:
+                months, growth = series[metric]
+                plot_growth(filename, months, growth, metric)
+
+    plot_relative_ranking(movers)
 
 
 if __name__ == "__main__":
@@ -109,10 +89,5 @@ if __name__ == "__main__":
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"SQLite DB not found at {db_path}")
 
-    # Load full table from SQLite
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("SELECT * FROM web_metrics", conn)
-    conn.close()
-
-    analyze_metrics(df)
+    analyze_metrics_from_db(db_path)
     print("Graphs saved to:", GRAPH_DIR)
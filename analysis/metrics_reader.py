@@ -0,0 +1,285 @@
+import os
+import json
+import hashlib
+import sqlite3
+from typing import Optional
+from utils import series_codec
+
+
+# Per-site series points with month-on-month growth; position 0 has no growth.
+CREATE_SITE_GROWTH = """
+CREATE TABLE IF NOT EXISTS site_growth (
+    filename TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    month TEXT,
+    value REAL,
+    growth REAL,
+    PRIMARY KEY (filename, metric, position)
+)
+"""
+
+# Per-site average growth and the relative growth score used for the ranking.
+# series_digest identifies the series a score was computed from, so unchanged sites are skipped on reload.
+CREATE_SITE_SCORES = """
+CREATE TABLE IF NOT EXISTS site_scores (
+    filename TEXT PRIMARY KEY,
+    avg_visit_growth REAL,
+    avg_rank_growth REAL,
+    score REAL,
+    series_digest TEXT
+)
+"""
+
+CREATE_SITE_SCORES_INDEX = "CREATE INDEX IF NOT EXISTS idx_site_scores_score ON site_scores (score DESC)"
+
+# Ranking queries answered from the score index: no recompute and no sort of the whole table
+TOP_K = "SELECT filename, score FROM site_scores ORDER BY score DESC LIMIT ?"
+BOTTOM_K = "SELECT filename, score FROM site_scores ORDER BY score ASC LIMIT ?"
+RANK_OF_SITE = """
+SELECT s.filename, s.score, 1 + (SELECT COUNT(*) FROM site_scores WHERE score > s.score)
+FROM site_scores AS s
+WHERE s.filename = ?
+"""
+
+
+# Restricts a statement to the filenames in the :filenames JSON list. Full refreshes use separate SQL
+# without it, so a filtered refresh reads the indexes for just those sites instead of scanning every table.
+SELECTED_SITES = "AND {column} IN (SELECT value FROM json_each(:filenames))"
+
+
+def _only(column: str, filenames: Optional[list[str]]) -> str:
+    return SELECTED_SITES.format(column=column) if filenames is not None else ""
+
+
+def _series_points(column: str, metric: str, value_key: str, sites: str = "") -> str:
+    """
+    Builds a SELECT that unpacks a JSON list column into one row per point.
+    Non-array values (e.g. '__MISSING__') and items without the expected keys are skipped,
+    matching what the original pandas analysis accepted.
+    """
+    return f"""
+    SELECT m.filename AS filename,
+           '{metric}' AS metric,
+           CAST(j.key AS INTEGER) AS idx,
+           json_extract(j.value, '$.month') AS month,
+           json_extract(j.value, '$.{value_key}') AS value
+    FROM web_metrics AS m,
+         json_each(COALESCE(
+             CASE WHEN json_valid(m.{column}) THEN
+                 CASE json_type(m.{column}) WHEN 'array' THEN m.{column} END
+             END, '[]')) AS j
+    WHERE j.type = 'object'
+      AND json_type(j.value, '$.month') IS NOT NULL
+      AND json_type(j.value, '$.{value_key}') IS NOT NULL
+      {sites}
+    """
+
+
+def _refresh_site_growth(sites: str = "") -> str:
+    points = (
+        _series_points("monthly_visits", "visits", "visits", sites)
+        + " UNION ALL "
+        + _series_points("rank_changes", "rank", "rank", sites)
+    )
+    return f"""
+INSERT INTO site_growth (filename, metric, position, month, value, growth)
+WITH points AS ({points}),
+ordered AS (
+    SELECT filename, metric, month, value,
+           ROW_NUMBER() OVER w - 1 AS position,
+           LAG(value) OVER w AS prev
+    FROM points
+    WINDOW w AS (PARTITION BY filename, metric ORDER BY idx)
+)
+SELECT filename, metric, position, month, value,
+       CASE
+           WHEN position > 0 AND prev IS NOT NULL AND prev != 0 AND value IS NOT NULL AND value != 0
+           THEN ROUND((value - prev) * 100.0 / prev, 2)
+       END
+FROM ordered
+"""
+
+
+def _refresh_site_scores(site_filter: str = "", growth_filter: str = "") -> str:
+    """Average growth divides by the number of growth points, including the empty ones."""
+    return f"""
+INSERT OR REPLACE INTO site_scores (filename, avg_visit_growth, avg_rank_growth, score)
+SELECT m.filename,
+       COALESCE(v.avg_growth, 0),
+       COALESCE(r.avg_growth, 0),
+       ROUND(COALESCE(v.avg_growth, 0) - COALESCE(r.avg_growth, 0), 2)
+FROM web_metrics AS m
+LEFT JOIN (
+    SELECT filename, COALESCE(SUM(growth), 0) * 1.0 / COUNT(*) AS avg_growth
+    FROM site_growth WHERE metric = 'visits' AND position > 0 {growth_filter} GROUP BY filename
+) AS v ON v.filename = m.filename
+LEFT JOIN (
+    SELECT filename, COALESCE(SUM(growth), 0) * 1.0 / COUNT(*) AS avg_growth
+    FROM site_growth WHERE metric = 'rank' AND position > 0 {growth_filter} GROUP BY filename
+) AS r ON r.filename = m.filename
+WHERE 1 {site_filter}
+"""
+
+
+REFRESH_SITE_GROWTH = _refresh_site_growth()
+REFRESH_SITE_SCORES = _refresh_site_scores()
+REFRESH_SELECTED_SITE_GROWTH = _refresh_site_growth(SELECTED_SITES.format(column="m.filename"))
+REFRESH_SELECTED_SITE_SCORES = _refresh_site_scores(
+    SELECTED_SITES.format(column="m.filename"), SELECTED_SITES.format(column="filename")
+)
+
+
+def _create_summary_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(CREATE_SITE_GROWTH)
+    conn.execute(CREATE_SITE_SCORES)
+    conn.execute(CREATE_SITE_SCORES_INDEX)
+    # site_scores written by older versions has no digest; those sites count as changed on the next load
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(site_scores)")}
+    if "series_digest" not in columns:
+        conn.execute("ALTER TABLE site_scores ADD COLUMN series_digest TEXT")
+
+
+def series_digest(record: dict) -> str:
+    """Digest of the series the growth summaries are built from (monthly_visits and rank_changes)."""
+    text = series_codec.encode([record.get("monthly_visits"), record.get("rank_changes")])
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def refresh_summary_tables(conn: sqlite3.Connection, filenames: Optional[list[str]] = None) -> None:
+    """
+    Rebuilds the site_growth and site_scores summary tables from web_metrics.
+    Called by the loader after each write so the analysis never has to decode the raw table.
+    When filenames is given, only those sites are refreshed.
+    """
+    _create_summary_tables(conn)
+
+    if filenames is None:
+        conn.execute("DELETE FROM site_growth")
+        conn.execute("DELETE FROM site_scores")
+        conn.execute(REFRESH_SITE_GROWTH)
+        conn.execute(REFRESH_SITE_SCORES)
+        return
+
+    params = {"filenames": json.dumps(filenames)}
+    conn.execute(f"DELETE FROM site_growth WHERE 1 {_only('filename', filenames)}", params)
+    conn.execute(f"DELETE FROM site_scores WHERE 1 {_only('filename', filenames)}", params)
+    conn.execute(REFRESH_SELECTED_SITE_GROWTH, params)
+    conn.execute(REFRESH_SELECTED_SITE_SCORES, params)
+
+
+def refresh_changed_sites(conn: sqlite3.Connection, records: list[dict], replace_all: bool = False) -> int:
+    """
+    Refreshes the summaries only for the sites whose series differ from the ones their current
+    score was computed from. With replace_all (web_metrics was rewritten from these records),
+    sites that are no longer loaded are dropped from the summaries too.
+    Returns the number of sites refreshed.
+    """
+    _create_summary_tables(conn)
+    digests = {record["filename"]: series_digest(record) for record in records}
+    if replace_all:
+        stored = dict(conn.execute("SELECT filename, series_digest FROM site_scores"))
+    else:
+        # Only the incoming sites can change, so only their digests are read
+        stored = dict(conn.execute(
+            f"SELECT filename, series_digest FROM site_scores WHERE 1 {_only('filename', list(digests))}",
+            {"filenames": json.dumps(list(digests))}
+        ))
+
+    changed = [filename for filename, digest in digests.items() if stored.get(filename) != digest]
+    if replace_all:
+        changed += [filename for filename in stored if filename not in digests]
+    if changed:
+        refresh_summary_tables(conn, changed)
+        conn.executemany(
+            "UPDATE site_scores SET series_digest = ? WHERE filename = ?",
+            [(digests[filename], filename) for filename in changed if filename in digests]
+        )
+    return len(changed)
+
+
+def ensure_summary_tables(conn: sqlite3.Connection) -> None:
+    """Builds the summary tables of databases written before they existed; a no-op otherwise."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if not {"site_growth", "site_scores"} <= tables:
+        with conn:
+            refresh_summary_tables(conn)
+
+
+class MetricsReader:
+    """
+    Access to the columns and summaries needed by the analysis. Queries only read, but the first
+    connection to a database written before the summary tables existed builds them (see ensure_summary_tables).
+    """
+
+    def __init__(self, db_path: str):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite DB not found at {db_path}")
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        ensure_summary_tables(conn)
+        return conn
+
+    def read_growth(self, filenames: Optional[list[str]] = None) -> dict:
+        """
+        Returns {filename: {"visits": (months, growth), "rank": (months, growth)}} from site_growth.
+        Months are the ones each growth point ends on, as plotted by analyze_metrics_from_db.
+        When filenames is given, only those sites are read.
+        """
+        growth = {}
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT filename, metric, month, growth FROM site_growth "
+                f"WHERE position > 0 {_only('filename', filenames)} ORDER BY filename, metric, position",
+                {"filenames": json.dumps(filenames) if filenames is not None else None}
+            )
+            for filename, metric, month, value in rows:
+                months, values = growth.setdefault(filename, {}).setdefault(metric, ([], []))
+                months.append(month)
+                values.append(value)
+        finally:
+            conn.close()
+        return growth
+
+    def read_ranking(self) -> list[dict]:
+        """Returns [{"site": ..., "score": ...}] ordered by score, best first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT filename, score FROM site_scores ORDER BY score DESC").fetchall()
+        finally:
+            conn.close()
+        return [{"site": filename, "score": score} for filename, score in rows]
+
+    def read_top(self, k: int = 10, bottom: bool = False) -> list[dict]:
+        """Returns the k best (or, with bottom, worst) sites by score, read through the score index."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(BOTTOM_K if bottom else TOP_K, (k,)).fetchall()
+        finally:
+            conn.close()
+        return [{"site": filename, "score": score} for filename, score in rows]
+
+    def read_rank(self, filename: str) -> Optional[dict]:
+        """Returns {"site", "score", "rank"} for one site (rank 1 is the best score), or None if unknown."""
+        conn = self._connect()
+        try:
+            row = conn.execute(RANK_OF_SITE, (filename,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {"site": row[0], "score": row[1], "rank": row[2]}
+
+
+if __name__ == "__main__":
+    from pprint import pprint
+
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    db_path = os.path.join(ROOT_DIR, "data", "output", "sqlite", "web_metrics.sqlite")
+
+    reader = MetricsReader(db_path)
+    print("Relative ranking:")
+    pprint(reader.read_ranking())
@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+from analysis.metrics_reader import ensure_summary_tables, TOP_K, BOTTOM_K, RANK_OF_SITE
+from utils import series_codec
+from utils.error_logger import log_exception
+
+# Statements are kept as constants so each pooled connection's statement cache reuses them.
+SQL_SITES = "SELECT filename, status FROM web_metrics ORDER BY filename"
+SQL_SITE = "SELECT * FROM web_metrics WHERE filename = ?"
+SQL_SITE_EXISTS = "SELECT 1 FROM web_metrics WHERE filename = ?"
+SQL_SERIES = (
+    "SELECT metric, month, value, growth FROM site_growth "
+    "WHERE filename = ? ORDER BY metric, position"
+)
+# Largest n accepted by /rankings, so one request cannot dump the table or flood the cache
+MAX_RANKING_N = 100
+
+SQL_STATUS_COUNTS = "SELECT status, COUNT(*) FROM web_metrics GROUP BY status"
+SQL_STATUS_SITES = "SELECT filename, status, missing_fields FROM web_metrics WHERE status != 'complete' ORDER BY filename"
+SQL_QUALITY = (
+    "SELECT field, present, empty, missing, malformed FROM quality_summary "
+    "WHERE run_id = (SELECT MAX(run_id) FROM quality_summary) ORDER BY field"
+)
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ReadOnlyPool:
+    """Fixed-size pool of read-only SQLite connections shared by the request threads."""
+
+    def __init__(self, db_path: str, size: int = 4):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite DB not found at {db_path}")
+
+        # Databases written before the summary tables existed are upgraded once, before going read-only
+        conn = sqlite3.connect(db_path)
+        ensure_summary_tables(conn)
+        conn.close()
+
+        self.connections = queue.Queue()
+        # PRAGMA data_version is a per-connection counter, so each connection's baseline is taken
+        # when it is opened; a commit made before a connection's first query is still detected.
+        self.data_versions = {}
+        uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=64)
+            self.data_versions[id(conn)] = conn.execute("PRAGMA data_version").fetchone()[0]
+            self.connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get().close()
+
+
+class MetricsQueryService:
+    """
+    Answers metrics queries from the SQLite store with cached results.
+    The cache is dropped whenever another connection (the loader or watch mode) commits,
+    detected through PRAGMA data_version.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4, cache_size: int = 256, cache_ttl: float = 30.0):
+        self.pool = ReadOnlyPool(db_path, size=pool_size)
+        self.cache = ResultCache(maxsize=cache_size, ttl=cache_ttl)
+        self.version_lock = threading.Lock()
+
+    def _query(self, key, build):
+        with self.pool.connection() as conn:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            with self.version_lock:
+                if self.pool.data_versions[id(conn)] != version:
+                    self.cache.clear()
+                    self.pool.data_versions[id(conn)] = version
+
+            result = self.cache.get(key)
+            if result is None:
+                result = build(conn)
+                self.cache.put(key, result)
+        return result
+
+    def sites(self) -> list[dict]:
+        def build(conn):
+            return [{"site": filename, "status": status} for filename, status in conn.execute(SQL_SITES)]
+        return self._query(("sites",), build)
+
+    def site(self, filename: str):
+        def build(conn):
+            cursor = conn.execute(SQL_SITE, (filename,))
+            row = cursor.fetchone()
+            if row is None:
+                return {}
+            record = dict(zip([col[0] for col in cursor.description], row))
+            for col in series_codec.NESTED_FIELDS:
+                if col in record:
+                    record[col] = series_codec.decode(record[col])
+            return record
+        return self._query(("site", filename), build) or None
+
+    def series(self, filename: str):
+        def build(conn):
+            if conn.execute(SQL_SITE_EXISTS, (filename,)).fetchone() is None:
+                return {}
+            series = {"visits": [], "rank": []}
+            for metric, month, value, growth in conn.execute(SQL_SERIES, (filename,)):
+                series[metric].append({"month": month, "value": value, "growth": growth})
+            return series
+        return self._query(("series", filename), build) or None
+
+    def ranking(self, n: int = 10, bottom: bool = False) -> list[dict]:
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        n = min(n, MAX_RANKING_N)
+
+        def build(conn):
+            rows = conn.execute(BOTTOM_K if bottom else TOP_K, (n,))
+            return [{"site": filename, "score": score} for filename, score in rows]
+        return self._query(("ranking", n, bottom), build)
+
+    def rank(self, filename: str):
+        def build(conn):
+            row = conn.execute(RANK_OF_SITE, (filename,)).fetchone()
+            return {"site": row[0], "score": row[1], "rank": row[2]} if row else {}
+        return self._query(("rank", filename), build) or None
+
+    def status(self) -> dict:
+        def build(conn):
+            return {
+                "counts": dict(conn.execute(SQL_STATUS_COUNTS).fetchall()),
+                "incomplete": [
+                    {
+                        "site": filename,
+                        "status": status,
+                        "missing_fields": [f for f in (missing or "").split(", ") if f]
+                    }
+                    for filename, status, missing in conn.execute(SQL_STATUS_SITES)
+                ]
+            }
+        return self._query(("status",), build)
+
+    def quality(self) -> list[dict]:
+        """Per-field completeness counts of the latest run, from the quality_summary table."""
+        def build(conn):
+            try:
+                rows = conn.execute(SQL_QUALITY).fetchall()
+            except sqlite3.OperationalError:
+                # No run has written quality counts yet
+                return []
+            return [
+                {"field": field, "present": present, "empty": empty, "missing": missing, "malformed": malformed}
+                for field, present, empty, missing, malformed in rows
+            ]
+        return self._query(("quality",), build)
+
+    def close(self):
+        self.pool.close()
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        GET /sites
+        GET /sites/<filename>
+        GET /sites/<filename>/series
+        GET /sites/<filename>/rank
+        GET /rankings/top?n=10
+        GET /rankings/bottom?n=10      (n >= 1, capped at MAX_RANKING_N)
+        GET /status
+        GET /quality
+    """
+
+    service: MetricsQueryService = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        params = parse_qs(url.query)
+
+        try:
+            if parts == ["sites"]:
+                body = self.service.sites()
+            elif len(parts) == 2 and parts[0] == "sites":
+                body = self.service.site(parts[1])
+            elif len(parts) == 3 and parts[0] == "sites" and parts[2] == "series":
+                body = self.service.series(parts[1])
+            elif len(parts) == 3 and parts[0] == "sites" and parts[2] == "rank":
+                body = self.service.rank(parts[1])
+            elif len(parts) == 2 and parts[0] == "rankings" and parts[1] in ("top", "bottom"):
+                n = int(params.get("n", ["10"])[0])
+                body = self.service.ranking(n, bottom=parts[1] == "bottom")
+            elif parts == ["status"]:
+                body = self.service.status()
+            elif parts == ["quality"]:
+                body = self.service.quality()
+            else:
+                return self._send(404, {"error": f"Unknown path: {url.path}"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except sqlite3.Error as e:
+            # e.g. a locked or corrupt database; details go to the error log, not the client
+            log_exception(self.__class__.__name__, "do_GET", e)
+            return self._send(500, {"error": f"Database error ({e.__class__.__name__})"})
+
+        if body is None:
+            return self._send(404, {"error": f"Site not found: {parts[1]}"})
+        self._send(200, body)
+
+    def _send(self, code: int, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet under load; errors are still returned to the client
+        pass
+
+
+def make_server(db_path: str, host: str = "127.0.0.1", port: int = 8000, **service_options) -> ThreadingHTTPServer:
+    handler = type("BoundQueryRequestHandler", (QueryRequestHandler,), {
+        "service": MetricsQueryService(db_path, **service_options)
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+    arg_parser = argparse.ArgumentParser(description="Serve web metrics from SQLite as JSON.")
+    arg_parser.add_argument("--db", default=os.path.join(ROOT_DIR, "data", "output", "sqlite", "web_metrics.sqlite"))
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--cache-ttl", type=float, default=30.0)
+    args = arg_parser.parse_args()
+
+    server = make_server(args.db, args.host, args.port, cache_ttl=args.cache_ttl)
+    print(f"Serving metrics from {args.db} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.service.close()
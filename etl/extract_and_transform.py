@@ -1,16 +1,31 @@
 import os
-import pandas as pd
 import sys
+import copy
+import tracemalloc
 from pprint import pprint
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
 from scraper.page_parser import PageParser
+from scraper.page_store import PageStore
 from utils.normalizer import Normalizer
 from utils.error_logger import error_logger
+from utils.memory_tracker import MemoryBudget, reset_traced_peak, untraced_worker, MB
+from etl.quality import QualityAggregator, series_raw_values, classify_record
+from etl.page_reader import PagePrefetcher, read_page
 
 
 # Ensure local imports work when script is run directly
 sys.path.append(os.path.dirname(__file__))
 
 
+@error_logger
+def get_report_month(page):
+    return page.extract_from_nested(
+        parent_selector="div.wa-overview__column.wa-overview__column--content",
+        child_selector="p.wa-overview__text--date"
+    )
+
+
 @error_logger
 def get_global_rank(page):
     return page.extract_from_nested(
@@ -113,26 +128,25 @@ def get_age_distribution(page):
     )
 
 
-def extract_and_transform() -> pd.DataFrame:
-    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    raw_html_dir = os.path.join(ROOT_DIR, "data", "raw_html")
-
-    html_files = [f for f in os.listdir(raw_html_dir) if f.endswith(".html")]
-
-    if not html_files:
-        raise FileNotFoundError("No HTML files found in data/raw_html/")
+def transform_page(html: str, filename: str, quality: Optional[QualityAggregator] = None) -> dict:
+    """
+    Runs one HTML page through PageParser, the extractors and Normalizer and returns the clean record.
+    When a QualityAggregator is given, the record's field completeness is added to it.
+    """
+    clean, field_quality = _transform_page(html, filename)
+    if quality is not None:
+        quality.add(field_quality)
+    return clean
 
-    records = []
-    error_count = 0
-
-    for file in html_files:
-        with open(os.path.join(raw_html_dir, file), "r", encoding="utf-8") as f:
-            html = f.read()
 
-        parser = PageParser(html, filename=file)
+def _transform_page(html: str, filename: str) -> tuple[dict, dict]:
+    """Returns the clean record and its {field: category} completeness classification."""
+    parser = PageParser(html, filename=filename)
 
+    try:
         raw = {
-            "filename": file,
+            "filename": filename,
+            "report_month": get_report_month(parser),
             "global_rank": get_global_rank(parser),
             "total_visits": get_total_visits(parser),
             "bounce_rate": get_bounce_rate(parser),
@@ -144,61 +158,207 @@ def extract_and_transform() -> pd.DataFrame:
             "top_countries": get_top_countries(parser),
             "age_distribution": get_age_distribution(parser)
         }
+    finally:
+        parser.close()
 
-        missing_fields = [k for k, v in raw.items() if v == "__MISSING__"]
-        if missing_fields:
-            error_count += 1
+    missing_fields = [k for k, v in raw.items() if v == "__MISSING__"]
+
+    if len(missing_fields) == len(raw) - 1:
+        status = "failed"
+    elif missing_fields:
+        status = "partial"
+    else:
+        status = "complete"
+
+    raw_values = series_raw_values(raw)
+    clean = {
+        "filename": filename,
+        "report_month": Normalizer.normalize_month(raw["report_month"]),
+        "global_rank": Normalizer.normalize_rank(raw["global_rank"]),
+        "total_visits": Normalizer.normalize_number(raw["total_visits"]),
+        "bounce_rate": Normalizer.normalize_percentage(raw["bounce_rate"]),
+        "pages_per_visit": Normalizer.normalize_number(raw["pages_per_visit"]),
+        "avg_visit_duration": Normalizer.normalize_duration(raw["avg_visit_duration"]),
+        "last_month_change": Normalizer.normalize_percentage(raw["last_month_change"]),
+        "rank_changes": Normalizer.normalize_list_field(
+            raw["rank_changes"],
+            key="value",
+            steps=[Normalizer.normalize_percentage]
+        ),
+        "monthly_visits": Normalizer.normalize_list_field(
+            raw["monthly_visits"],
+            key="visits",
+            steps=[Normalizer.normalize_number]
+        ),
+        "top_countries": Normalizer.normalize_list_field(
+            raw["top_countries"],
+            key="value",
+            steps=[Normalizer.normalize_percentage]
+        ),
+        "age_distribution": Normalizer.normalize_list_field(
+            raw["age_distribution"],
+            key="percentage",
+            steps=[Normalizer.handle_missing, Normalizer.normalize_percentage]
+        ),
+        "status": status,
+        "missing_fields": ", ".join(missing_fields) if missing_fields else ""
+    }
+
+    return clean, classify_record(raw, raw_values, clean)
+
+
+def transform_file(path: str) -> tuple[dict, dict]:
+    """
+    Reads and transforms one HTML file, returning (record, field quality).
+    Top-level so it can run in worker processes; quality is aggregated back in the parent.
+    """
+    return _transform_page(read_page(path), os.path.basename(path))
+
+
+def transform_stored_page(task: tuple) -> tuple[dict, dict]:
+    """Reads and transforms one blob from a PageStore; task is (store, content_hash, filename)."""
+    store, content_hash, filename = task
+    return _transform_page(store.get(content_hash), filename)
+
+
+def _extract_within_budget(tasks: list, budget: MemoryBudget, transform=transform_file) -> list[tuple[dict, dict]]:
+    """
+    Processes pages in batches planned by the memory budget. Pages parsed in-process are
+    measured with tracemalloc to learn the per-page cost; larger batches go to worker processes.
+    transform must be a top-level function so it can be sent to the workers.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
 
-        if len(missing_fields) == len(raw) - 1:
-            status = "failed"
-        elif missing_fields:
-            status = "partial"
+    records = []
+    pool = None
+    pool_workers = 1
+    most_workers = 1
+    position = 0
+    try:
+        while position < len(tasks):
+            batch_size, workers = budget.plan()
+            batch = tasks[position:position + batch_size]
+            position += len(batch)
+
+            if workers == 1:
+                if pool:
+                    # Idle workers still hold their memory, so the pool goes when parsing moves in-process
+                    pool.shutdown()
+                    pool = None
+                    pool_workers = 1
+                for task in batch:
+                    start = tracemalloc.get_traced_memory()[0]
+                    reset_traced_peak()
+                    records.append(transform(task))
+                    budget.observe(tracemalloc.get_traced_memory()[1] - start)
+            else:
+                if pool_workers != workers:
+                    if pool:
+                        pool.shutdown()
+                    pool = ProcessPoolExecutor(max_workers=workers, initializer=untraced_worker)
+                    pool_workers = workers
+                    most_workers = max(most_workers, workers)
+                records.extend(pool.map(transform, batch))
+                budget.observe_workers()
+    finally:
+        if pool:
+            pool.shutdown()
+        if started_tracing:
+            tracemalloc.stop()
+
+    print(
+        f"Processed {len(tasks)} page(s) within a {budget.limit // MB} MB budget "
+        f"(~{(budget.per_page or 0) / MB:.1f} MB per page, up to {most_workers} worker(s))."
+    )
+    return records
+
+
+def _extract_from_store(page_store: PageStore, memory_budget: Optional[MemoryBudget]) -> list[tuple[dict, dict]]:
+    """
+    Transforms each distinct content hash once, then gives every site entry pointing at it
+    its own copy of the record under the entry's filename.
+    """
+    entries = page_store.entries(latest_only=True)
+    if not entries:
+        raise FileNotFoundError(f"No pages found in page store {page_store.root}")
+
+    sites_by_hash = {}
+    for site, _, content_hash in entries:
+        sites_by_hash.setdefault(content_hash, []).append(site)
+
+    tasks = [(page_store, content_hash, sites[0]) for content_hash, sites in sites_by_hash.items()]
+    if memory_budget is None:
+        prefetcher = PagePrefetcher(tasks, load=lambda task: page_store.get(task[1]))
+        transformed = [_transform_page(html, filename) for (_, _, filename), html in prefetcher]
+        prefetcher.report()
+    else:
+        transformed = _extract_within_budget(tasks, memory_budget, transform=transform_stored_page)
+
+    records = []
+    for (_, content_hash, _), (clean, field_quality) in zip(tasks, transformed):
+        for site in sites_by_hash[content_hash]:
+            record = clean if site == clean["filename"] else {**copy.deepcopy(clean), "filename": site}
+            records.append((record, field_quality))
+
+    print(f"Transformed {len(tasks)} distinct page(s) for {len(entries)} site entr{'y' if len(entries) == 1 else 'ies'}.")
+    return records
+
+
+def extract_records(memory_budget: Optional[MemoryBudget] = None,
+                    page_store: Optional[PageStore] = None,
+                    quality: Optional[QualityAggregator] = None) -> list[dict]:
+    """
+    Extracts and transforms every page in data/raw_html into clean records, without pandas.
+    With a page_store, the latest snapshot of each site is read from the store instead.
+    With a memory_budget, batch size and worker count adapt to stay under its limit.
+    With a QualityAggregator, per-field completeness counts are streamed into it.
+    """
+    if page_store is not None:
+        results = _extract_from_store(page_store, memory_budget)
+    else:
+        ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        raw_html_dir = os.path.join(ROOT_DIR, "data", "raw_html")
+
+        html_files = [f for f in os.listdir(raw_html_dir) if f.endswith(".html")]
+
+        if not html_files:
+            raise FileNotFoundError("No HTML files found in data/raw_html/")
+
+        paths = [os.path.join(raw_html_dir, file) for file in html_files]
+        if memory_budget is None:
+            # Read the next pages on background threads while the current one is parsed
+            prefetcher = PagePrefetcher(paths)
+            results = [_transform_page(html, os.path.basename(path)) for path, html in prefetcher]
+            prefetcher.report()
         else:
-            status = "complete"
-
-        clean = {
-            "filename": file,
-            "global_rank": Normalizer.normalize_rank(raw["global_rank"]),
-            "total_visits": Normalizer.normalize_number(raw["total_visits"]),
-            "bounce_rate": Normalizer.normalize_percentage(raw["bounce_rate"]),
-            "pages_per_visit": Normalizer.normalize_number(raw["pages_per_visit"]),
-            "avg_visit_duration": Normalizer.normalize_duration(raw["avg_visit_duration"]),
-            "last_month_change": Normalizer.normalize_percentage(raw["last_month_change"]),
-            "rank_changes": Normalizer.normalize_list_field(
-                raw["rank_changes"],
-                key="value",
-                steps=[Normalizer.normalize_percentage]
-            ),
-            "monthly_visits": Normalizer.normalize_list_field(
-                raw["monthly_visits"],
-                key="visits",
-                steps=[Normalizer.normalize_number]
-            ),
-            "top_countries": Normalizer.normalize_list_field(
-                raw["top_countries"],
-                key="value",
-                steps=[Normalizer.normalize_percentage]
-            ),
-            "age_distribution": Normalizer.normalize_list_field(
-                raw["age_distribution"],
-                key="percentage",
-                steps=[Normalizer.handle_missing, Normalizer.normalize_percentage]
-            ),
-            "status": status,
-            "missing_fields": ", ".join(missing_fields) if missing_fields else ""
-        }
+            results = _extract_within_budget(paths, memory_budget)
 
+    records = []
+    for clean, field_quality in results:
+        if quality is not None:
+            quality.add(field_quality)
         records.append(clean)
 
-    # pprint(clean)
-    df = pd.DataFrame(records)
+    error_count = sum(1 for clean in records if clean["missing_fields"])
 
+    # pprint(clean)
     if error_count:
         print(f"{error_count} record(s) contained missing data. See logs or dashboard for detail.")
     else:
         print("Extraction completed successfully.")
 
-    return df
+    return records
+
+
+def extract_and_transform(memory_budget: Optional[MemoryBudget] = None,
+                          page_store: Optional[PageStore] = None,
+                          quality: Optional[QualityAggregator] = None):
+    """Same as extract_records, returned as a pandas DataFrame (pandas is imported only here)."""
+    import pandas as pd
+
+    return pd.DataFrame(extract_records(memory_budget=memory_budget, page_store=page_store, quality=quality))
 
 
 if __name__ == "__main__":
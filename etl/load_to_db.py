@@ -1,55 +1,125 @@
 import os
 import sqlite3
-import pandas as pd
-import json
 import sys
+from analysis.metrics_reader import refresh_changed_sites
+from etl.snapshot_store import SnapshotStore
+from utils import series_codec
 
 
 class DatabaseLoader:
 
     """Handles transformation and loading of web metrics data into a SQLite database."""
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+
+    DTYPE_MAP = {
+        "filename": "TEXT",
+        "report_month": "TEXT",
+        "global_rank": "INTEGER",
+        "total_visits": "INTEGER",
+        "bounce_rate": "REAL",
+        "pages_per_visit": "REAL",
+        "avg_visit_duration": "INTEGER",
+        "last_month_change": "REAL",
+        "rank_changes": "TEXT",  # Lists → stored as stringified JSON
+        "monthly_visits": "TEXT",
+        "top_countries": "TEXT",
+        "age_distribution": "TEXT",
+        "status": "TEXT",
+        "missing_fields": "TEXT"
+    }
+
+    def __init__(self, data, columns: list[str] = None):
+        """
+        Accepts a pandas DataFrame or a list of record dicts (as returned by extract_records).
+        pandas itself is not needed to load records.
+        columns fixes the table layout when there may be no records (e.g. an empty shard).
+        """
+        if hasattr(data, "to_dict"):
+            data = data.to_dict("records")
+        self.records = list(data)
+        if columns is not None:
+            self.columns = list(columns)
+        else:
+            self.columns = list(self.records[0].keys()) if self.records else []
 
     def _prepare_data(self):
         """
-        Convert list or dictionary columns to JSON strings.
+        Find the list or dictionary columns that are stored as JSON strings.
+        The known nested fields are always encoded, even when every value in this batch is '__MISSING__',
+        so each column has one encoding regardless of what a given load contained.
+        Values are encoded row by row while inserting, so no encoded copy of the data is held in memory.
         """
 
-        for col in self.df.columns:
-            if self.df[col].apply(lambda v: isinstance(v, (list, dict))).any():
-                self.df[col] = self.df[col].apply(json.dumps)
+        self.json_columns = {col for col in self.columns if col in series_codec.NESTED_FIELDS} | {
+            col for col in self.columns
+            if any(isinstance(record.get(col), (list, dict)) for record in self.records)
+        }
+
+    def _create_table(self, conn: sqlite3.Connection, table_name: str):
+        columns = ", ".join(f'"{col}" {self.DTYPE_MAP.get(col, "TEXT")}' for col in self.columns)
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns})')
+
+    def _insert_rows(self, conn: sqlite3.Connection, table_name: str):
+        names = ", ".join(f'"{col}"' for col in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        conn.executemany(
+            f'INSERT INTO "{table_name}" ({names}) VALUES ({placeholders})',
+            (
+                tuple(
+                    series_codec.encode(record.get(col)) if col in self.json_columns else record.get(col)
+                    for col in self.columns
+                )
+                for record in self.records
+            )
+        )
 
     def load_to_sqlite(self, db_path: str, table_name: str = "web_metrics"):
 
         self._prepare_data()
 
-        dtype_map = {
-            "filename": "TEXT",
-            "global_rank": "INTEGER",
-            "total_visits": "INTEGER",
-            "bounce_rate": "REAL",
-            "pages_per_visit": "REAL",
-            "avg_visit_duration": "INTEGER",
-            "last_month_change": "REAL",
-            "rank_changes": "TEXT",  # Lists → stored as stringified JSON
-            "monthly_visits": "TEXT",
-            "top_countries": "TEXT",
-            "age_distribution": "TEXT",
-            "status": "TEXT",
-            "missing_fields": "TEXT"
-        }
-
         with sqlite3.connect(db_path) as conn:
-            self.df.to_sql(
-                name=table_name,
-                con=conn,
-                if_exists="replace",
-                index=False,
-                dtype=dtype_map
-            )
+            conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            self._create_table(conn, table_name)
+            self._insert_rows(conn, table_name)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_filename ON {table_name} (filename)")
+            refreshed = refresh_changed_sites(conn, self.records, replace_all=True) if table_name == "web_metrics" else 0
 
         print(f"Data successfully written to {db_path} in table '{table_name}'.")
+        if refreshed:
+            print(f"Growth ranking updated for {refreshed} changed site(s).")
+
+        # web_metrics is replaced on each load; the snapshot store keeps the history across runs
+        SnapshotStore(db_path).add_records(self.records)
+
+    def upsert_to_sqlite(self, db_path: str, table_name: str = "web_metrics"):
+        """
+        Replaces only the rows whose filename is in these records, leaving other sites untouched.
+        Used by watch mode to load single pages without rewriting the table.
+        """
+        self._prepare_data()
+        filenames = [record["filename"] for record in self.records]
+
+        with sqlite3.connect(db_path) as conn:
+            table_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+            ).fetchone()
+            if table_exists:
+                # Tables written by older versions may lack newer columns
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+                for col in self.columns:
+                    if col not in existing:
+                        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {col} {self.DTYPE_MAP.get(col, 'TEXT')}")
+                conn.executemany(f"DELETE FROM {table_name} WHERE filename = ?", [(f,) for f in filenames])
+            else:
+                self._create_table(conn, table_name)
+
+            self._insert_rows(conn, table_name)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_filename ON {table_name} (filename)")
+            if table_name == "web_metrics":
+                refresh_changed_sites(conn, self.records)
+
+        print(f"Upserted {len(filenames)} row(s) into {db_path} table '{table_name}'.")
+
+        SnapshotStore(db_path).add_records(self.records)
 
 
 if __name__ == "__main__":
@@ -58,6 +128,7 @@ if __name__ == "__main__":
     then prints sample schema and data.
     """
 
+    import pandas as pd
     from pprint import pprint
     ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     output_dir = os.path.join(ROOT_DIR, "data", "output", "csv")
@@ -87,6 +158,10 @@ if __name__ == "__main__":
 
     csv_path = os.path.join(output_dir, selected_filename)
     df = pd.read_csv(csv_path)
+    packed = series_codec.read_series_file(csv_path, len(df))
+    for col in series_codec.NESTED_FIELDS:
+        if col in df.columns:
+            df[col] = packed[col] if packed and col in packed else series_codec.decode_many(df[col])
 
     loader = DatabaseLoader(df)
     loader.load_to_sqlite(db_path)
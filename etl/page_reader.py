@@ -0,0 +1,125 @@
+import os
+import mmap
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Files at least this large are decoded straight from a memory map instead of a read buffer
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+_buffers = threading.local()
+
+
+def _decode(data) -> str:
+    """Decodes UTF-8 bytes once, with the same newline handling as open(..., "r")."""
+    html = str(data, "utf-8")
+    if "\r" in html:
+        html = html.replace("\r\n", "\n").replace("\r", "\n")
+    return html
+
+
+def _read_buffer(size: int) -> memoryview:
+    """Returns a per-thread buffer of at least `size` bytes, reused across pages."""
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = bytearray(size)
+        _buffers.buffer = buffer
+    return memoryview(buffer)[:size]
+
+
+def read_page(path: str) -> str:
+    """
+    Reads and decodes one HTML file.
+    Small files are read into a reused per-thread buffer; large files are memory-mapped.
+    Either way the bytes are decoded once, without an intermediate bytes copy.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ""
+        if size >= MMAP_THRESHOLD:
+            # The view must be released before the map closes, or a decode error turns into a BufferError
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return _decode(view)
+
+        view = _read_buffer(size)
+        try:
+            filled = 0
+            while filled < size:
+                count = f.readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+            return _decode(view[:filled])
+        finally:
+            view.release()
+
+
+class PagePrefetcher:
+    """
+    Iterates over (item, html) in order while the next `depth` pages are read on a background
+    thread pool, so the caller parses one page while the following ones are loaded.
+    `load` turns an item into HTML (read_page for paths, PageStore.get for content hashes).
+
+    Timings: `read_seconds` is the time spent loading on the pool threads, `wait_seconds` the time
+    the caller was stalled waiting for a page, and `parse_seconds` the time the caller spent on each
+    page before asking for the next one.
+    """
+
+    def __init__(self, items, load=read_page, depth: int = 4, workers: int = 2):
+        self.items = list(items)
+        self.load = load
+        self.depth = max(1, depth)
+        self.workers = max(1, workers)
+        self.read_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def _timed_load(self, item) -> str:
+        start = time.perf_counter()
+        try:
+            return self.load(item)
+        finally:
+            with self._lock:
+                self.read_seconds += time.perf_counter() - start
+
+    def __iter__(self):
+        pending = deque()
+        remaining = iter(self.items)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch") as pool:
+            try:
+                for item in remaining:
+                    pending.append((item, pool.submit(self._timed_load, item)))
+                    if len(pending) >= self.depth:
+                        break
+
+                while pending:
+                    item, future = pending.popleft()
+                    start = time.perf_counter()
+                    html = future.result()
+                    self.wait_seconds += time.perf_counter() - start
+
+                    # Keep the queue full before handing the page to the caller
+                    for next_item in remaining:
+                        pending.append((next_item, pool.submit(self._timed_load, next_item)))
+                        break
+
+                    self.pages += 1
+                    start = time.perf_counter()
+                    yield item, html
+                    self.parse_seconds += time.perf_counter() - start
+            finally:
+                # Early exit (error or break): do not read pages nobody will parse
+                for _, future in pending:
+                    future.cancel()
+
+    def report(self) -> None:
+        print(
+            f"Read {self.pages} page(s) with {self.depth}-page read-ahead: "
+            f"read {self.read_seconds:.2f}s on {self.workers} thread(s), "
+            f"stalled on I/O {self.wait_seconds:.2f}s, parse {self.parse_seconds:.2f}s."
+        )
@@ -0,0 +1,174 @@
+import os
+import uuid
+import sqlite3
+from datetime import datetime
+from typing import Optional
+from utils.normalizer import Normalizer
+
+
+CATEGORIES = ("present", "empty", "missing", "malformed")
+
+# Key holding the value inside each point of the list fields
+SERIES_VALUE_KEYS = {
+    "rank_changes": "rank",
+    "monthly_visits": "visits",
+    "top_countries": "value",
+    "age_distribution": "percentage",
+}
+
+CREATE_QUALITY_SUMMARY = """
+CREATE TABLE IF NOT EXISTS quality_summary (
+    run_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    present INTEGER NOT NULL DEFAULT 0,
+    empty INTEGER NOT NULL DEFAULT 0,
+    missing INTEGER NOT NULL DEFAULT 0,
+    malformed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, field)
+)
+"""
+
+
+def classify_value(raw, clean) -> str:
+    """
+    present:   normalized to a value
+    empty:     the page shows a placeholder ('', '--', 'n/a', ...) per Normalizer.handle_missing
+    missing:   the extractor could not find the element ('__MISSING__')
+    malformed: there was text, but the normalizer could not parse it (returned None)
+    """
+    if raw == "__MISSING__":
+        return "missing"
+    if raw is None or (isinstance(raw, str) and Normalizer.handle_missing(raw) is None):
+        return "empty"
+    if clean is None:
+        return "malformed"
+    return "present"
+
+
+def classify_series(raw, raw_values: list, clean, value_key: str) -> str:
+    """
+    Classifies a list field from its point values before (raw_values) and after normalization.
+    A list is empty when it has no points or only placeholders, and malformed when any point is.
+    """
+    if raw == "__MISSING__":
+        return "missing"
+    if not isinstance(raw, list) or not isinstance(clean, list):
+        return "malformed"
+
+    statuses = [classify_value(r, item.get(value_key)) for r, item in zip(raw_values, clean)]
+    if not statuses or all(status == "empty" for status in statuses):
+        return "empty"
+    if "malformed" in statuses:
+        return "malformed"
+    return "present"
+
+
+def series_raw_values(raw: dict) -> dict:
+    """Snapshots the raw point values of the list fields; normalization rewrites the points in place."""
+    return {
+        field: [item.get(key) for item in raw[field]] if isinstance(raw.get(field), list) else None
+        for field, key in SERIES_VALUE_KEYS.items()
+    }
+
+
+def classify_record(raw: dict, raw_values: dict, clean: dict) -> dict:
+    """Returns {field: category} for every extracted field of one record."""
+    quality = {}
+    for field, raw_value in raw.items():
+        if field == "filename":
+            continue
+        if field in SERIES_VALUE_KEYS:
+            quality[field] = classify_series(raw_value, raw_values[field], clean[field], SERIES_VALUE_KEYS[field])
+        else:
+            quality[field] = classify_value(raw_value, clean[field])
+    return quality
+
+
+def new_run_id() -> str:
+    """
+    Unique id for one run. Flushes add to the counts of an existing run_id, so runs started in the
+    same instant must not share one; the timestamp prefix keeps ids in start order for MAX(run_id).
+    """
+    return f"{datetime.now().isoformat(timespec='microseconds')}-{uuid.uuid4().hex[:8]}"
+
+
+class QualityAggregator:
+    """
+    Streams per-field completeness counts for one run in constant memory (one counter per field and category).
+    Counts are flushed to the quality_summary table additively, so a long-running watch session can
+    flush after every batch and keep a single row per field.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or new_run_id()
+        self.counts = {}
+        self.records = 0
+
+    def add(self, field_quality: dict) -> None:
+        """Adds one record's {field: category} classification."""
+        self.records += 1
+        for field, category in field_quality.items():
+            counts = self.counts.setdefault(field, dict.fromkeys(CATEGORIES, 0))
+            counts[category] += 1
+
+    def flush(self, db_path: str) -> None:
+        """Adds the pending counts to quality_summary and resets them."""
+        if not self.counts:
+            return
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(CREATE_QUALITY_SUMMARY)
+            conn.executemany(
+                """
+                INSERT INTO quality_summary (run_id, field, present, empty, missing, malformed)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, field) DO UPDATE SET
+                    present = present + excluded.present,
+                    empty = empty + excluded.empty,
+                    missing = missing + excluded.missing,
+                    malformed = malformed + excluded.malformed
+                """,
+                [
+                    (self.run_id, field, *(counts[c] for c in CATEGORIES))
+                    for field, counts in self.counts.items()
+                ]
+            )
+        conn.close()
+        self.counts = {}
+
+    def report(self) -> None:
+        if not self.counts:
+            return
+        print(f"\nField completeness ({self.records} record(s)):")
+        print(f"  {'field':<20}" + "".join(f"{c:>10}" for c in CATEGORIES))
+        for field, counts in self.counts.items():
+            print(f"  {field:<20}" + "".join(f"{counts[c]:>10}" for c in CATEGORIES))
+
+
+def read_quality(db_path: str, run_id: Optional[str] = None) -> list[dict]:
+    """Returns the per-field summary rows of one run (the latest when run_id is None)."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(CREATE_QUALITY_SUMMARY)
+        if run_id is None:
+            run_id = conn.execute("SELECT MAX(run_id) FROM quality_summary").fetchone()[0]
+        rows = conn.execute(
+            "SELECT field, present, empty, missing, malformed FROM quality_summary WHERE run_id = ? ORDER BY field",
+            (run_id,)
+        ).fetchall()
+    conn.close()
+
+    summary = []
+    for field, *counts in rows:
+        total = sum(counts)
+        entry = {"run_id": run_id, "field": field, **dict(zip(CATEGORIES, counts))}
+        entry["completeness"] = round(counts[0] / total, 4) if total else None
+        summary.append(entry)
+    return summary
+
+
+if __name__ == "__main__":
+    from pprint import pprint
+
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    db_path = os.path.join(ROOT_DIR, "data", "output", "sqlite", "web_metrics.sqlite")
+
+    pprint(read_quality(db_path))
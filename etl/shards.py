@@ -0,0 +1,294 @@
+import os
+import time
+import sqlite3
+import hashlib
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from analysis.metrics_reader import MetricsReader
+from etl.load_to_db import DatabaseLoader
+from utils.memory_tracker import untraced_worker
+
+
+CATALOG_NAME = "catalog.sqlite"
+
+# Reads ATTACH every shard to one connection, so a store cannot have more shards than SQLite's
+# default limit on attached databases (SQLITE_MAX_ATTACHED).
+MAX_SHARDS = 10
+
+# The catalog is the main database of a federated connection: it lists the shards and holds
+# run-level tables that are not partitioned by site (e.g. quality_summary).
+CREATE_SHARD_CATALOG = """
+CREATE TABLE IF NOT EXISTS shard_catalog (
+    shard INTEGER PRIMARY KEY,
+    file TEXT NOT NULL
+)
+"""
+
+# Site-partitioned tables exposed as UNION ALL views on a federated connection
+FEDERATED_TABLES = ("web_metrics", "site_growth", "site_scores", "series_snapshots", "snapshot_scores")
+
+
+def shard_for(filename: str, shard_count: int) -> int:
+    """Stable shard number for a site (Python's hash() is salted per process, so it cannot be used)."""
+    digest = hashlib.blake2b(filename.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def shard_file(shard: int) -> str:
+    return f"shard_{shard:03d}.sqlite"
+
+
+def read_catalog(shard_dir: str) -> list[tuple[int, str]]:
+    """Returns [(shard, path)] for a shard directory, or [] when nothing has been loaded there yet."""
+    catalog_path = os.path.join(shard_dir, CATALOG_NAME)
+    if not os.path.exists(catalog_path):
+        return []
+    with sqlite3.connect(catalog_path) as conn:
+        conn.execute(CREATE_SHARD_CATALOG)
+        rows = conn.execute("SELECT shard, file FROM shard_catalog ORDER BY shard").fetchall()
+    conn.close()
+    return [(shard, os.path.join(shard_dir, file)) for shard, file in rows]
+
+
+def _load_shard(task: tuple) -> int:
+    """Loads one shard file in a worker process; task is (path, records, columns)."""
+    path, records, columns = task
+    DatabaseLoader(records, columns=columns).load_to_sqlite(path)
+    return len(records)
+
+
+class ShardedLoader:
+    """
+    Partitions records by site hash across `shard_count` SQLite files and writes the shards
+    concurrently, one worker process per shard, so a run is not limited to SQLite's single writer.
+    Each shard is a complete web_metrics database (summaries and snapshot store included) for its sites.
+    """
+
+    def __init__(self, data, shard_count: int, max_workers: Optional[int] = None):
+        if not 1 <= shard_count <= MAX_SHARDS:
+            raise ValueError(f"shard_count must be between 1 and {MAX_SHARDS}, the number of shards a read can attach")
+        if hasattr(data, "to_dict"):
+            data = data.to_dict("records")
+        self.records = list(data)
+        self.columns = list(self.records[0].keys()) if self.records else []
+        self.shard_count = shard_count
+        self.max_workers = max_workers or min(shard_count, os.cpu_count() or 1)
+
+    def _partition(self) -> list[list[dict]]:
+        partitions = [[] for _ in range(self.shard_count)]
+        for record in self.records:
+            partitions[shard_for(record["filename"], self.shard_count)].append(record)
+        return partitions
+
+    def _prepare_catalog(self, shard_dir: str) -> None:
+        existing = read_catalog(shard_dir)
+        if existing and len(existing) != self.shard_count:
+            raise ValueError(
+                f"{shard_dir} holds {len(existing)} shard(s); compact and clear it with "
+                f"`python -m etl.shards --reset` or use another directory to load with {self.shard_count}"
+            )
+        os.makedirs(shard_dir, exist_ok=True)
+        with sqlite3.connect(os.path.join(shard_dir, CATALOG_NAME)) as conn:
+            conn.execute(CREATE_SHARD_CATALOG)
+            conn.executemany(
+                "INSERT OR REPLACE INTO shard_catalog (shard, file) VALUES (?, ?)",
+                [(shard, shard_file(shard)) for shard in range(self.shard_count)]
+            )
+        conn.close()
+
+    def load_to_shards(self, shard_dir: str) -> None:
+        """Replaces the contents of every shard with these records."""
+        self._prepare_catalog(shard_dir)
+        # Every shard is rewritten, even empty ones, so sites that are gone disappear from them too
+        tasks = [
+            (os.path.join(shard_dir, shard_file(shard)), records, self.columns)
+            for shard, records in enumerate(self._partition())
+        ]
+
+        started_at = time.perf_counter()
+        if self.max_workers == 1:
+            loaded = sum(map(_load_shard, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=untraced_worker) as pool:
+                loaded = sum(pool.map(_load_shard, tasks))
+        print(
+            f"Loaded {loaded} row(s) into {len(tasks)} shard(s) in {shard_dir} "
+            f"with {self.max_workers} writer(s) in {time.perf_counter() - started_at:.2f}s."
+        )
+
+
+def _attached_shards(conn: sqlite3.Connection) -> list[str]:
+    return [row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith("shard_")]
+
+
+def _table_columns(conn: sqlite3.Connection, schema: str, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+
+def connect_shards(shard_dir: str) -> sqlite3.Connection:
+    """
+    Opens the catalog with every shard ATTACHed and creates TEMP views named after the
+    site-partitioned tables (web_metrics, site_growth, site_scores, ...) as UNION ALL of the shards,
+    so queries written for a single web_metrics.sqlite run unchanged.
+    """
+    shards = read_catalog(shard_dir)
+    if not shards:
+        raise FileNotFoundError(f"No shard catalog found in {shard_dir}")
+
+    if len(shards) > MAX_SHARDS:
+        raise ValueError(f"{len(shards)} shards exceed SQLite's limit of {MAX_SHARDS} attached databases; compact them first")
+
+    conn = sqlite3.connect(os.path.join(shard_dir, CATALOG_NAME))
+    for shard, path in shards:
+        # ATTACH would create a missing file; a shard that was never written has nothing to read
+        if os.path.exists(path):
+            conn.execute(f"ATTACH DATABASE ? AS shard_{shard}", (path,))
+
+    for table in FEDERATED_TABLES:
+        selects = []
+        columns = None
+        for schema in _attached_shards(conn):
+            shard_columns = _table_columns(conn, schema, table)
+            if not shard_columns:
+                continue
+            columns = columns or shard_columns
+            selects.append(
+                "SELECT " + ", ".join(f'"{col}"' if col in shard_columns else f'NULL AS "{col}"' for col in columns)
+                + f' FROM {schema}."{table}"'
+            )
+        if selects:
+            conn.execute(f'CREATE TEMP VIEW "{table}" AS ' + " UNION ALL ".join(selects))
+    return conn
+
+
+class ShardedMetricsReader(MetricsReader):
+    """MetricsReader over a shard directory; every query runs against the federated views."""
+
+    def __init__(self, shard_dir: str):
+        if not read_catalog(shard_dir):
+            raise FileNotFoundError(f"No shard catalog found in {shard_dir}")
+        self.shard_dir = shard_dir
+        self.db_path = os.path.join(shard_dir, CATALOG_NAME)
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect_shards(self.shard_dir)
+
+    def read_top(self, k: int = 10, bottom: bool = False) -> list[dict]:
+        """Takes the top k of each shard through its score index and merges those, instead of scanning the view."""
+        order = "ASC" if bottom else "DESC"
+        conn = self._connect()
+        try:
+            per_shard = [
+                f"SELECT * FROM (SELECT filename, score FROM {schema}.site_scores ORDER BY score {order} LIMIT :k)"
+                for schema in _attached_shards(conn)
+                if _table_columns(conn, schema, "site_scores")
+            ]
+            if not per_shard:
+                return []
+            rows = conn.execute(" UNION ALL ".join(per_shard) + f" ORDER BY score {order} LIMIT :k", {"k": k}).fetchall()
+        finally:
+            conn.close()
+        return [{"site": filename, "score": score} for filename, score in rows]
+
+
+def _copy_tables(conn: sqlite3.Connection, schema: str, skip: tuple = ()) -> dict:
+    """
+    Copies every table of an attached database into main, creating or widening tables as needed.
+    Returns the database's {index name: CREATE INDEX statement} so indexes can be built after all rows are in.
+    """
+    indexes = {}
+    objects = conn.execute(
+        f"SELECT type, name, sql FROM {schema}.sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    for obj_type, name, sql in objects:
+        if obj_type == "index":
+            indexes[name] = sql
+            continue
+        if obj_type != "table" or name in skip:
+            continue
+
+        target = {row[1] for row in conn.execute(f'PRAGMA main.table_info("{name}")')}
+        source = [(row[1], row[2]) for row in conn.execute(f'PRAGMA {schema}.table_info("{name}")')]
+        if not target:
+            conn.execute(sql)
+        else:
+            for col, col_type in source:
+                if col not in target:
+                    conn.execute(f'ALTER TABLE main."{name}" ADD COLUMN "{col}" {col_type}')
+
+        names = ", ".join(f'"{col}"' for col, _ in source)
+        conn.execute(f'INSERT INTO main."{name}" ({names}) SELECT {names} FROM {schema}."{name}"')
+    return indexes
+
+
+def compact_shards(shard_dir: str, output_path: str, overwrite: bool = False) -> None:
+    """
+    Merges every shard (and the catalog's run-level tables) into one SQLite file with the same
+    layout DatabaseLoader writes, so MetricsReader and the read API can use it directly.
+    Shards are attached one at a time, so any number of shards can be compacted.
+    An existing output file (which may hold snapshot history of its own) is only replaced with overwrite.
+    """
+    shards = read_catalog(shard_dir)
+    if not shards:
+        raise FileNotFoundError(f"No shard catalog found in {shard_dir}")
+    if os.path.exists(output_path) and not overwrite:
+        raise FileExistsError(f"{output_path} already exists; pass overwrite=True (--force) to replace it")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + ".compacting"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    indexes = {}
+    conn = sqlite3.connect(tmp_path)
+    try:
+        sources = [os.path.join(shard_dir, CATALOG_NAME)] + [path for _, path in shards]
+        for position, path in enumerate(sources):
+            conn.execute("ATTACH DATABASE ? AS source", (path,))
+            with conn:
+                skip = ("shard_catalog",) if position == 0 else ()
+                indexes.update(_copy_tables(conn, "source", skip))
+            conn.execute("DETACH DATABASE source")
+
+        # Indexes are built once, after all rows are in
+        with conn:
+            for sql in indexes.values():
+                conn.execute(sql)
+    finally:
+        conn.close()
+    os.replace(tmp_path, output_path)
+
+    print(f"Compacted {len(shards)} shard(s) from {shard_dir} into {output_path}.")
+
+
+def reset_shards(shard_dir: str) -> None:
+    """Deletes the catalog and every shard it lists, so the directory can be loaded with another shard count."""
+    shards = read_catalog(shard_dir)
+    for _, path in shards:
+        if os.path.exists(path):
+            os.remove(path)
+    os.remove(os.path.join(shard_dir, CATALOG_NAME))
+    print(f"Removed {len(shards)} shard(s) from {shard_dir}.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    sqlite_dir = os.path.join(ROOT_DIR, "data", "output", "sqlite")
+
+    arg_parser = argparse.ArgumentParser(description="Compact a sharded web_metrics store into one SQLite file.")
+    arg_parser.add_argument("--shards", default=os.path.join(sqlite_dir, "shards"), help="Shard directory")
+    arg_parser.add_argument("--output", default=os.path.join(sqlite_dir, "web_metrics_compacted.sqlite"))
+    arg_parser.add_argument("--force", action="store_true", help="Replace the output file if it exists")
+    arg_parser.add_argument(
+        "--reset", action="store_true", help="Delete the shards once compacted, so the directory can be reloaded"
+    )
+    args = arg_parser.parse_args()
+
+    try:
+        compact_shards(args.shards, args.output, overwrite=args.force)
+    except FileExistsError as e:
+        arg_parser.exit(1, f"{e}\n")
+    if args.reset:
+        reset_shards(args.shards)
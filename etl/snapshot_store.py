@@ -0,0 +1,239 @@
+import os
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+
+# One row per (site, metric, month); later observations of the same month replace earlier ones.
+# growth is the change from the previous stored month and only counts when counted = 1.
+CREATE_SNAPSHOTS = """
+CREATE TABLE IF NOT EXISTS series_snapshots (
+    site TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    month TEXT NOT NULL,
+    value REAL,
+    growth REAL,
+    counted INTEGER NOT NULL DEFAULT 0,
+    loaded_at TEXT NOT NULL,
+    PRIMARY KEY (site, metric, month)
+)
+"""
+
+# Running totals per (site, metric), adjusted by deltas as points arrive.
+CREATE_AGGREGATES = """
+CREATE TABLE IF NOT EXISTS series_aggregates (
+    site TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    point_count INTEGER NOT NULL DEFAULT 0,
+    growth_count INTEGER NOT NULL DEFAULT 0,
+    growth_sum REAL NOT NULL DEFAULT 0,
+    first_month TEXT,
+    last_month TEXT,
+    PRIMARY KEY (site, metric)
+)
+"""
+
+CREATE_SCORES = """
+CREATE TABLE IF NOT EXISTS snapshot_scores (
+    site TEXT PRIMARY KEY,
+    avg_visit_growth REAL,
+    avg_rank_growth REAL,
+    score REAL
+)
+"""
+
+CREATE_SCORES_INDEX = "CREATE INDEX IF NOT EXISTS idx_snapshot_scores_score ON snapshot_scores (score DESC)"
+
+# Record column -> (metric name, value key inside each point)
+SERIES_FIELDS = {
+    "monthly_visits": ("visits", "visits"),
+    "rank_changes": ("rank", "rank"),
+}
+
+
+def compute_point_growth(prev: Optional[float], curr: Optional[float]) -> Optional[float]:
+    """Same rule as analyze_metrics.compute_growth, for a single pair of points."""
+    if prev and curr and prev != 0:
+        return round(((curr - prev) / prev) * 100, 2)
+    return None
+
+
+def resolve_month_label(label: str, report_month: str) -> Optional[str]:
+    """
+    Turns a chart label like 'Oct' into 'YYYY-MM', using the page's report month ('2022-12')
+    as the most recent month shown. Labels after the report month belong to the previous year.
+    """
+    try:
+        month_num = datetime.strptime(label.strip()[:3], "%b").month
+        report = datetime.strptime(report_month, "%Y-%m")
+    except (AttributeError, TypeError, ValueError):
+        return None
+    year = report.year if month_num <= report.month else report.year - 1
+    return f"{year:04d}-{month_num:02d}"
+
+
+class SnapshotStore:
+    """
+    Accumulates monthly_visits and rank_changes points across runs, deduplicated by (site, month),
+    and keeps MoM growth, average growth and the relative score up to date incrementally.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(CREATE_SNAPSHOTS)
+            conn.execute(CREATE_AGGREGATES)
+            conn.execute(CREATE_SCORES)
+            conn.execute(CREATE_SCORES_INDEX)
+        conn.close()
+
+    def add_records(self, records: list[dict]) -> int:
+        """
+        Adds the series of each extracted record. Records without a usable report_month are skipped,
+        since their chart labels cannot be placed in time. Returns the number of new or changed points.
+        """
+        loaded_at = datetime.now().isoformat(timespec="seconds")
+        changed = 0
+        touched_sites = set()
+
+        with sqlite3.connect(self.db_path) as conn:
+            for record in records:
+                report_month = record.get("report_month")
+                if not isinstance(report_month, str) or report_month == "__MISSING__":
+                    continue
+
+                site = record["filename"]
+                for field, (metric, value_key) in SERIES_FIELDS.items():
+                    points = record.get(field)
+                    if not isinstance(points, list):
+                        continue
+                    for point in points:
+                        if not isinstance(point, dict) or "month" not in point or value_key not in point:
+                            continue
+                        month = resolve_month_label(point["month"], report_month)
+                        if month is None:
+                            continue
+                        if self._upsert_point(conn, site, metric, month, point[value_key], loaded_at):
+                            changed += 1
+                            touched_sites.add(site)
+
+            for site in touched_sites:
+                self._refresh_score(conn, site)
+        conn.close()
+
+        print(f"Snapshot store updated: {changed} new or changed point(s) across {len(touched_sites)} site(s).")
+        return changed
+
+    def _upsert_point(self, conn, site, metric, month, value, loaded_at) -> bool:
+        """Writes one point and adjusts growth for it and its successor. Returns False if nothing changed."""
+        existing = conn.execute(
+            "SELECT value FROM series_snapshots WHERE site = ? AND metric = ? AND month = ?",
+            (site, metric, month)
+        ).fetchone()
+        if existing is not None and existing[0] == value:
+            return False
+
+        if existing is None:
+            conn.execute(
+                "INSERT INTO series_snapshots (site, metric, month, value, loaded_at) VALUES (?, ?, ?, ?, ?)",
+                (site, metric, month, value, loaded_at)
+            )
+            conn.execute(
+                """
+                INSERT INTO series_aggregates (site, metric, point_count, first_month, last_month)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (site, metric) DO UPDATE SET
+                    point_count = point_count + 1,
+                    first_month = MIN(first_month, excluded.first_month),
+                    last_month = MAX(last_month, excluded.last_month)
+                """,
+                (site, metric, month, month)
+            )
+        else:
+            conn.execute(
+                "UPDATE series_snapshots SET value = ?, loaded_at = ? WHERE site = ? AND metric = ? AND month = ?",
+                (value, loaded_at, site, metric, month)
+            )
+
+        # Only this point and the next one depend on the new value
+        self._recompute_growth(conn, site, metric, month)
+        following = conn.execute(
+            "SELECT month FROM series_snapshots WHERE site = ? AND metric = ? AND month > ? ORDER BY month LIMIT 1",
+            (site, metric, month)
+        ).fetchone()
+        if following:
+            self._recompute_growth(conn, site, metric, following[0])
+        return True
+
+    def _recompute_growth(self, conn, site, metric, month) -> None:
+        value, old_growth, old_counted = conn.execute(
+            "SELECT value, growth, counted FROM series_snapshots WHERE site = ? AND metric = ? AND month = ?",
+            (site, metric, month)
+        ).fetchone()
+        previous = conn.execute(
+            "SELECT value FROM series_snapshots WHERE site = ? AND metric = ? AND month < ? ORDER BY month DESC LIMIT 1",
+            (site, metric, month)
+        ).fetchone()
+
+        counted = 1 if previous else 0
+        growth = compute_point_growth(previous[0], value) if previous else None
+
+        conn.execute(
+            "UPDATE series_snapshots SET growth = ?, counted = ? WHERE site = ? AND metric = ? AND month = ?",
+            (growth, counted, site, metric, month)
+        )
+        conn.execute(
+            """
+            UPDATE series_aggregates
+            SET growth_count = growth_count + ?, growth_sum = growth_sum + ?
+            WHERE site = ? AND metric = ?
+            """,
+            (counted - old_counted, (growth or 0) - (old_growth or 0), site, metric)
+        )
+
+    def _refresh_score(self, conn, site) -> None:
+        averages = {"visits": 0, "rank": 0}
+        rows = conn.execute(
+            "SELECT metric, growth_sum, growth_count FROM series_aggregates WHERE site = ?", (site,)
+        )
+        for metric, growth_sum, growth_count in rows:
+            averages[metric] = growth_sum / growth_count if growth_count else 0
+
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshot_scores (site, avg_visit_growth, avg_rank_growth, score) VALUES (?, ?, ?, ?)",
+            (site, averages["visits"], averages["rank"], round(averages["visits"] - averages["rank"], 2))
+        )
+
+    def read_series(self, site: str, metric: str) -> list[dict]:
+        """Returns the stored points for one site and metric ('visits' or 'rank'), oldest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT month, value, growth FROM series_snapshots WHERE site = ? AND metric = ? ORDER BY month",
+                (site, metric)
+            ).fetchall()
+        conn.close()
+        return [{"month": month, "value": value, "growth": growth} for month, value, growth in rows]
+
+    def read_scores(self) -> list[dict]:
+        """Returns the long-horizon relative growth scores, best first."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT site, avg_visit_growth, avg_rank_growth, score FROM snapshot_scores ORDER BY score DESC"
+            ).fetchall()
+        conn.close()
+        return [
+            {"site": site, "avg_visit_growth": avg_visit, "avg_rank_growth": avg_rank, "score": score}
+            for site, avg_visit, avg_rank, score in rows
+        ]
+
+
+if __name__ == "__main__":
+    from pprint import pprint
+
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    db_path = os.path.join(ROOT_DIR, "data", "output", "sqlite", "web_metrics.sqlite")
+
+    store = SnapshotStore(db_path)
+    print("Long-horizon scores:")
+    pprint(store.read_scores())
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import struct
+import ctypes
+import ctypes.util
+from etl.extract_and_transform import transform_page
+from etl.load_to_db import DatabaseLoader
+from etl.page_reader import read_page
+from etl.quality import QualityAggregator, new_run_id
+from utils.error_logger import log_exception
+
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0x00000800
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifySource:
+    """Reports names of files changed in a directory using Linux inotify through libc."""
+
+    def __init__(self, directory: str):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def changed_names(self) -> set[str]:
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            _, _, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingSource:
+    """Fallback change source that compares (mtime, size) of every file between scans."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.seen = self._scan()
+
+    def _scan(self) -> dict:
+        state = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                state[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def changed_names(self) -> set[str]:
+        current = self._scan()
+        changed = {name for name, sig in current.items() if self.seen.get(name) != sig}
+        self.seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class HtmlWatcher:
+    """
+    Long-running watch mode: loads new or modified HTML pages into SQLite as they arrive.
+    A file is processed once its size and mtime have been stable for `debounce` seconds,
+    so pages that are still being written are not parsed half-way.
+    """
+
+    def __init__(self, raw_html_dir: str, db_path: str, debounce: float = 1.0,
+                 poll_interval: float = 0.5, use_polling: bool = False):
+        self.raw_html_dir = raw_html_dir
+        self.db_path = db_path
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        # name -> (signature, time the signature was last seen changing)
+        self.pending = {}
+        # One quality run per watch session; each batch's counts are flushed under it once the batch is loaded
+        self.quality_run_id = new_run_id()
+
+        self.source = None
+        if not use_polling:
+            try:
+                self.source = InotifySource(raw_html_dir)
+                print("Watching with inotify.")
+            except OSError as e:
+                print(f"inotify unavailable ({e}); falling back to polling.")
+        if self.source is None:
+            self.source = PollingSource(raw_html_dir)
+            print(f"Watching by polling every {poll_interval}s.")
+
+    def _signature(self, name: str):
+        try:
+            stat = os.stat(os.path.join(self.raw_html_dir, name))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _ready_files(self) -> list[str]:
+        now = time.monotonic()
+        for name in self.source.changed_names():
+            if name.endswith(".html"):
+                self.pending[name] = (self._signature(name), now)
+
+        ready = []
+        for name, (signature, changed_at) in list(self.pending.items()):
+            current = self._signature(name)
+            if current is None:
+                del self.pending[name]
+            elif current != signature:
+                self.pending[name] = (current, now)
+            elif now - changed_at >= self.debounce:
+                ready.append(name)
+                del self.pending[name]
+        return ready
+
+    def process(self, names: list[str]) -> None:
+        """
+        Loads a batch of files. A file that cannot be read or transformed is logged and skipped;
+        if the database write fails, the batch is logged and left pending so it is retried.
+        """
+        records = []
+        quality = QualityAggregator(self.quality_run_id)
+        for name in names:
+            try:
+                html = read_page(os.path.join(self.raw_html_dir, name))
+                records.append(transform_page(html, name, quality=quality))
+            except Exception as e:
+                log_exception(self.__class__.__name__, f"process[{name}]", e)
+        if not records:
+            return
+
+        try:
+            DatabaseLoader(records).upsert_to_sqlite(self.db_path)
+            quality.flush(self.db_path)
+        except Exception as e:
+            log_exception(self.__class__.__name__, "process", e)
+            now = time.monotonic()
+            for record in records:
+                self.pending[record["filename"]] = (self._signature(record["filename"]), now)
+            print(f"Could not load {len(records)} file(s); will retry.")
+            return
+
+        for record in records:
+            print(f"Loaded {record['filename']} ({record['status']}).")
+
+    def run(self, max_iterations: int = None) -> None:
+        iterations = 0
+        try:
+            while max_iterations is None or iterations < max_iterations:
+                ready = self._ready_files()
+                if ready:
+                    self.process(ready)
+                time.sleep(self.poll_interval)
+                iterations += 1
+        except KeyboardInterrupt:
+            print("Watch mode stopped.")
+        finally:
+            self.source.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+    arg_parser = argparse.ArgumentParser(description="Load new or modified HTML pages into SQLite as they arrive.")
+    arg_parser.add_argument("--dir", default=os.path.join(ROOT_DIR, "data", "raw_html"))
+    arg_parser.add_argument("--db", default=os.path.join(ROOT_DIR, "data", "output", "sqlite", "web_metrics.sqlite"))
+    arg_parser.add_argument("--debounce", type=float, default=1.0, help="Seconds a file must be unchanged before loading")
+    arg_parser.add_argument("--poll", action="store_true", help="Force polling instead of inotify")
+    args = arg_parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db), exist_ok=True)
+    HtmlWatcher(args.dir, args.db, debounce=args.debounce, use_polling=args.poll).run()
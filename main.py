@@ -1,22 +1,81 @@
 import os
-import pandas as pd
+import csv
+import argparse
+from contextlib import nullcontext
 from datetime import datetime
-from etl.extract_and_transform import extract_and_transform
-from etl.load_to_db import DatabaseLoader
-from analysis.analyze_metrics import analyze_metrics
-import sqlite3
+from utils.import_timer import timed_import
+from utils.series_codec import encode_record, write_series_file
 
-def save_to_csv(df: pd.DataFrame, output_path: str) -> None:
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subsystems are imported inside main() so that extraction and CSV/SQLite writes never load pandas or matplotlib.
+
+
+def save_to_csv(records: list[dict], output_path: str) -> None:
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False, encoding="utf-8")
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0].keys()))
+        writer.writeheader()
+        # Nested series are written as compact JSON so they round-trip exactly on reload
+        writer.writerows(encode_record(record) for record in records)
+    # Packed copy of the nested series, so a reload does not have to parse them back from text
+    write_series_file(records, output_path)
     print(f"Data saved to {output_path}")
 
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="Extract, transform and load web metrics.")
+    arg_parser.add_argument(
+        "--memory-budget", type=float, metavar="MB",
+        help="Keep the run under this many MB: adapts batch/worker counts and reports peak memory per stage"
+    )
+    arg_parser.add_argument("--max-workers", type=int, help="Upper bound on worker processes under a memory budget")
+    arg_parser.add_argument(
+        "--page-store", nargs="?", const=os.path.join(ROOT_DIR, "data", "page_store"), metavar="DIR",
+        help="Import data/raw_html into the content-addressed page store and extract from it"
+    )
+    arg_parser.add_argument(
+        "--shards", type=int, metavar="N",
+        help="Load SQLite as N (at most 10) site-hash shards written in parallel (data/output/sqlite/shards)"
+    )
+    args = arg_parser.parse_args()
+    if args.shards is not None:
+        # Checked before extracting, so a run is not lost to a shard count the analysis cannot read
+        max_shards = timed_import("etl.shards").MAX_SHARDS
+        if not 1 <= args.shards <= max_shards:
+            arg_parser.error(f"--shards must be between 1 and {max_shards}")
+
+    tracker = budget = None
+    if args.memory_budget:
+        memory_tracker = timed_import("utils.memory_tracker")
+        tracker = memory_tracker.MemoryTracker()
+        budget = memory_tracker.MemoryBudget(args.memory_budget, max_workers=args.max_workers)
+
+    def stage(name):
+        return tracker.stage(name) if tracker else nullcontext()
+
+    page_store = None
+    if args.page_store:
+        page_store = timed_import("scraper.page_store").PageStore(args.page_store)
+        page_store.import_directory(os.path.join(ROOT_DIR, "data", "raw_html"))
+
+    try:
+        run(stage, budget, page_store, args.shards)
+    finally:
+        if tracker:
+            tracker.report()
+
+
+def run(stage, budget, page_store=None, shards=None):
     print("Starting Extract and Transform phase...")
-    df = extract_and_transform()
+    quality = timed_import("etl.quality").QualityAggregator()
+    with stage("extract"):
+        records = timed_import("etl.extract_and_transform").extract_records(
+            memory_budget=budget, page_store=page_store, quality=quality
+        )
+    quality.report()
 
-    if df.empty:
+    if not records:
         print("No data extracted. Skipping Load phase.")
         return
 
@@ -31,29 +90,29 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_csv = os.path.join("data", "output","csv", f"data_{timestamp}.csv")
     sqlite_db_path = os.path.join("data", "output", "sqlite", "web_metrics.sqlite")
+    shard_dir = os.path.join("data", "output", "sqlite", "shards")
     did_load_sqlite = False
 
-    if choice == "1":
-        save_to_csv(df, output_csv)
-    elif choice == "2":
-        loader = DatabaseLoader(df)
-        loader.load_to_sqlite(sqlite_db_path)
-        did_load_sqlite = True
-    elif choice == "3":
-        save_to_csv(df, output_csv)
-        loader = DatabaseLoader(df)
-        loader.load_to_sqlite(sqlite_db_path)
+    if choice in ("1", "3"):
+        with stage("csv"):
+            save_to_csv(records, output_csv)
+    if choice in ("2", "3"):
+        with stage("sqlite"):
+            if shards:
+                shard_module = timed_import("etl.shards")
+                shard_module.ShardedLoader(records, shards).load_to_shards(shard_dir)
+                quality.flush(os.path.join(shard_dir, shard_module.CATALOG_NAME))
+            else:
+                loader = timed_import("etl.load_to_db").DatabaseLoader(records)
+                loader.load_to_sqlite(sqlite_db_path)
+                quality.flush(sqlite_db_path)
         did_load_sqlite = True
-    else:
-        pass
 
     if did_load_sqlite:
         print("\nDo you want to run analysis and generate graphs? [y/n]")
         if input().strip().lower() == "y":
-            sqlite_db = sqlite3.connect(sqlite_db_path)
-            df_sqlite = pd.read_sql_query("SELECT * FROM web_metrics", sqlite_db)
-            sqlite_db.close()
-            analyze_metrics(df_sqlite)
+            with stage("analysis"):
+                timed_import("analysis.analyze_metrics").analyze_metrics_from_db(shard_dir if shards else sqlite_db_path)
             print("Graphs saved in data/output/graphs")
 
 if __name__ == "__main__":
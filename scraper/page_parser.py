@@ -9,6 +9,15 @@ class PageParser:
         self.soup = BeautifulSoup(html_content, "html.parser")
         self.filename = filename
 
+    def close(self) -> None:
+        """
+        Breaks up the parse tree once all fields are extracted.
+        The tree is full of parent/child reference cycles, so without this it is only freed by the cyclic GC.
+        """
+        if self.soup is not None:
+            self.soup.decompose()
+            self.soup = None
+
     def extract_from_nested(self, parent_selector: str, child_selector: str) -> Optional[str]:
         """ For standard div > p lookups"""
         parent = self.soup.select_one(parent_selector)
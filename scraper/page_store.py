@@ -0,0 +1,160 @@
+import os
+import gzip
+import sqlite3
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+
+CREATE_BLOBS = """
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    compression TEXT
+)
+"""
+
+# One entry per saved page; many entries may point at the same blob.
+CREATE_PAGES = """
+CREATE TABLE IF NOT EXISTS pages (
+    site TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    content_hash TEXT NOT NULL REFERENCES blobs (content_hash),
+    stored_at TEXT NOT NULL,
+    PRIMARY KEY (site, snapshot_date)
+)
+"""
+
+CREATE_PAGES_HASH_INDEX = "CREATE INDEX IF NOT EXISTS idx_pages_content_hash ON pages (content_hash)"
+
+
+class PageStore:
+    """
+    Content-addressed store for raw HTML pages.
+    Blobs are keyed by the SHA-256 of the page bytes, so identical snapshots are stored once;
+    a (site, snapshot_date) index in SQLite maps each saved page to its blob.
+    """
+
+    def __init__(self, root: str, compression: Optional[str] = "gzip"):
+        if compression not in (None, "gzip"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.root = root
+        self.compression = compression
+        self.index_path = os.path.join(root, "index.sqlite")
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+
+        with sqlite3.connect(self.index_path) as conn:
+            conn.execute(CREATE_BLOBS)
+            conn.execute(CREATE_PAGES)
+            conn.execute(CREATE_PAGES_HASH_INDEX)
+        conn.close()
+
+    def _blob_path(self, content_hash: str, compression: Optional[str]) -> str:
+        suffix = ".html.gz" if compression == "gzip" else ".html"
+        return os.path.join(self.root, "blobs", content_hash[:2], content_hash + suffix)
+
+    def put(self, site: str, snapshot_date: str, html) -> str:
+        """Stores a page and returns its content hash. The blob is only written if it is new."""
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        with sqlite3.connect(self.index_path) as conn:
+            exists = conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+            if not exists:
+                stored = gzip.compress(data, mtime=0) if self.compression == "gzip" else data
+                path = self._blob_path(content_hash, self.compression)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write to a temp file first so a crash never leaves a truncated blob under its hash
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(stored)
+                os.replace(tmp_path, path)
+                conn.execute(
+                    "INSERT INTO blobs (content_hash, size, stored_size, compression) VALUES (?, ?, ?, ?)",
+                    (content_hash, len(data), len(stored), self.compression)
+                )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (site, snapshot_date, content_hash, stored_at) VALUES (?, ?, ?, ?)",
+                (site, snapshot_date, content_hash, datetime.now().isoformat(timespec="seconds"))
+            )
+        conn.close()
+        return content_hash
+
+    def put_file(self, path: str, site: str = None, snapshot_date: str = None) -> str:
+        """Stores a file; site defaults to the filename and snapshot_date to the file's modification date."""
+        site = site or os.path.basename(path)
+        snapshot_date = snapshot_date or datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+        with open(path, "rb") as f:
+            return self.put(site, snapshot_date, f.read())
+
+    def import_directory(self, directory: str) -> int:
+        """Stores every .html file in a directory. Returns the number of files seen."""
+        files = [f for f in os.listdir(directory) if f.endswith(".html")]
+        for file in files:
+            self.put_file(os.path.join(directory, file))
+        return len(files)
+
+    def get(self, content_hash: str) -> str:
+        with sqlite3.connect(self.index_path) as conn:
+            row = conn.execute("SELECT compression FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+        conn.close()
+        if row is None:
+            raise KeyError(f"Blob not found: {content_hash}")
+
+        with open(self._blob_path(content_hash, row[0]), "rb") as f:
+            data = f.read()
+        if row[0] == "gzip":
+            data = gzip.decompress(data)
+        return data.decode("utf-8")
+
+    def entries(self, latest_only: bool = True) -> list[tuple[str, str, str]]:
+        """
+        Returns (site, snapshot_date, content_hash) entries.
+        With latest_only, only each site's most recent snapshot is returned.
+        """
+        query = "SELECT site, snapshot_date, content_hash FROM pages"
+        if latest_only:
+            query += " WHERE (site, snapshot_date) IN (SELECT site, MAX(snapshot_date) FROM pages GROUP BY site)"
+        with sqlite3.connect(self.index_path) as conn:
+            rows = conn.execute(query + " ORDER BY site, snapshot_date").fetchall()
+        conn.close()
+        return rows
+
+    def stats(self) -> dict:
+        with sqlite3.connect(self.index_path) as conn:
+            pages = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs, raw_bytes, stored_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+            logical_bytes = conn.execute(
+                "SELECT COALESCE(SUM(b.size), 0) FROM pages AS p JOIN blobs AS b USING (content_hash)"
+            ).fetchone()[0]
+        conn.close()
+        return {
+            "pages": pages,
+            "blobs": blobs,
+            "logical_bytes": logical_bytes,
+            "unique_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    from pprint import pprint
+
+    ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    arg_parser = argparse.ArgumentParser(description="Content-addressed raw HTML store.")
+    arg_parser.add_argument("--store", default=os.path.join(ROOT_DIR, "data", "page_store"))
+    arg_parser.add_argument("--import-dir", help="Import every .html file from this directory")
+    arg_parser.add_argument("--no-compression", action="store_true")
+    args = arg_parser.parse_args()
+
+    store = PageStore(args.store, compression=None if args.no_compression else "gzip")
+    if args.import_dir:
+        print(f"Imported {store.import_directory(args.import_dir)} file(s) from {args.import_dir}")
+    pprint(store.stats())
@@ -0,0 +1,24 @@
+import pytest
+
+
+def _make_record(filename, status="complete", **fields):
+    record = {
+        "filename": filename,
+        "report_month": "2022-12",
+        "global_rank": 10,
+        "total_visits": 1000,
+        "rank_changes": [{"month": "Nov", "rank": 12}, {"month": "Dec", "rank": 10}],
+        "monthly_visits": [{"month": "Nov", "visits": 900}, {"month": "Dec", "visits": 1000}],
+        "top_countries": [],
+        "age_distribution": [],
+        "status": status,
+        "missing_fields": "",
+    }
+    record.update(fields)
+    return record
+
+
+@pytest.fixture
+def make_record():
+    """Factory for clean records as extract_records returns them; keyword arguments override fields."""
+    return _make_record
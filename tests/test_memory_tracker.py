@@ -0,0 +1,34 @@
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import memory_tracker
+from utils.memory_tracker import MB, MemoryBudget, untraced_worker
+
+
+def test_plan_counts_each_worker_as_a_full_process(monkeypatch):
+    monkeypatch.setattr(memory_tracker, "current_rss", lambda: 60 * MB)
+    budget = MemoryBudget(400, max_workers=8)
+    budget.observe(10 * MB)
+    # (400 - 60) // (60 + 10) workers fit next to the parent
+    assert budget.plan()[1] == 4
+
+    budget.per_worker = 100 * MB
+    assert budget.plan()[1] == 3
+
+
+def test_plan_warns_when_one_page_does_not_fit(monkeypatch, capsys):
+    monkeypatch.setattr(memory_tracker, "current_rss", lambda: 60 * MB)
+    budget = MemoryBudget(10)
+    assert budget.plan() == (1, 1)
+    budget.observe(10 * MB)
+    assert budget.plan() == (1, 1)
+    assert capsys.readouterr().out.count("Warning") == 1
+
+
+def test_pool_workers_do_not_inherit_tracing():
+    tracemalloc.start()
+    try:
+        with ProcessPoolExecutor(max_workers=1, initializer=untraced_worker) as pool:
+            assert pool.submit(tracemalloc.is_tracing).result() is False
+    finally:
+        tracemalloc.stop()
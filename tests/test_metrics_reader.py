@@ -0,0 +1,60 @@
+import sqlite3
+
+from analysis.analyze_metrics import compute_growth
+from analysis.metrics_reader import MetricsReader
+from etl.load_to_db import DatabaseLoader
+
+
+def test_filtered_refresh_leaves_other_sites_untouched(tmp_path, make_record):
+    db_path = str(tmp_path / "web_metrics.sqlite")
+    DatabaseLoader([make_record("a.html"), make_record("b.html")]).load_to_sqlite(db_path)
+
+    # Marks b's summary rows, so a refresh that rewrote them would be visible
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE site_growth SET growth = -1 WHERE filename = 'b.html'")
+        conn.execute("UPDATE site_scores SET score = 999 WHERE filename = 'b.html'")
+        before = conn.execute("SELECT * FROM site_growth WHERE filename = 'b.html' ORDER BY metric, position").fetchall()
+    conn.close()
+
+    changed = make_record("a.html", monthly_visits=[{"month": "Nov", "visits": 500}, {"month": "Dec", "visits": 1000}])
+    DatabaseLoader([changed]).upsert_to_sqlite(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        after = conn.execute("SELECT * FROM site_growth WHERE filename = 'b.html' ORDER BY metric, position").fetchall()
+    conn.close()
+    assert after == before
+    scores = {entry["site"]: entry["score"] for entry in MetricsReader(db_path).read_ranking()}
+    assert scores == {"b.html": 999, "a.html": round(100.0 - (10 - 12) * 100.0 / 12, 2)}
+
+
+def pandas_era_score(record):
+    """The score the original pandas analyze_metrics gave a record; non-list series counted as empty."""
+    averages = []
+    for field, key in (("monthly_visits", "visits"), ("rank_changes", "rank")):
+        series = record[field] if isinstance(record[field], list) else []
+        growth = compute_growth([v[key] for v in series if isinstance(v, dict) and key in v and "month" in v])
+        averages.append(sum(g for g in growth if g is not None) / len(growth) if growth else 0)
+    return round(averages[0] - averages[1], 2)
+
+
+def test_summary_scores_match_the_python_scores(tmp_path, make_record):
+    def points(key, *values):
+        return [{"month": month, key: value} for month, value in zip(("Sep", "Oct", "Nov", "Dec"), values)]
+
+    records = [
+        make_record("plain.html", monthly_visits=points("visits", 700, 800, 900, 1000)),
+        make_record("none.html", monthly_visits=points("visits", 700, None, 900, 1000), rank_changes=points("rank", 5, None)),
+        make_record("zero.html", monthly_visits=points("visits", 0, 800, 0, 1000), rank_changes=points("rank", 3, 3)),
+        make_record("missing_visits.html", monthly_visits="__MISSING__", rank_changes=points("rank", 20, 15, 12)),
+        make_record("missing_both.html", monthly_visits="__MISSING__", rank_changes="__MISSING__"),
+        make_record("single.html", monthly_visits=points("visits", 1000), rank_changes=[]),
+        make_record(
+            "odd_points.html",
+            monthly_visits=[{"month": "Oct", "visits": 800}, "junk", {"visits": 5}, {"month": "Dec", "visits": 1000}],
+        ),
+    ]
+    db_path = str(tmp_path / "web_metrics.sqlite")
+    DatabaseLoader(records).load_to_sqlite(db_path)
+
+    scores = {entry["site"]: entry["score"] for entry in MetricsReader(db_path).read_ranking()}
+    assert scores == {record["filename"]: pandas_era_score(record) for record in records}
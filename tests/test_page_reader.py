@@ -0,0 +1,21 @@
+import pytest
+
+from etl import page_reader
+from etl.page_reader import read_page
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, page_reader.MMAP_THRESHOLD])
+def test_read_page_matches_text_mode(tmp_path, monkeypatch, mmap_threshold):
+    monkeypatch.setattr(page_reader, "MMAP_THRESHOLD", mmap_threshold)
+    path = tmp_path / "page.html"
+    path.write_bytes("<p>a\r\nb\rc Côte d'Ivoire</p>".encode("utf-8"))
+    with open(path, "r", encoding="utf-8") as f:
+        assert read_page(str(path)) == f.read()
+
+
+def test_decode_error_on_mapped_file_is_not_masked(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_reader, "MMAP_THRESHOLD", 1)
+    path = tmp_path / "page.html"
+    path.write_bytes(b"<html>\xff\xfe</html>")
+    with pytest.raises(UnicodeDecodeError):
+        read_page(str(path))
@@ -0,0 +1,49 @@
+import copy
+import os
+
+from etl.extract_and_transform import extract_records
+from scraper.page_store import PageStore
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), "..", "data", "raw_html", "similarweb-google-com.html")
+
+
+def blob_files(store):
+    return [name for _, _, files in os.walk(os.path.join(store.root, "blobs")) for name in files]
+
+
+def test_identical_pages_share_one_blob(tmp_path):
+    store = PageStore(str(tmp_path / "store"))
+    first = store.put("a.html", "2023-01-01", "<html>same</html>")
+    assert store.put("b.html", "2023-01-01", "<html>same</html>") == first
+    assert store.put("a.html", "2023-02-01", b"<html>same</html>") == first
+    store.put("a.html", "2023-03-01", "<html>changed</html>")
+
+    stats = store.stats()
+    assert (stats["pages"], stats["blobs"]) == (4, 2)
+    assert len(blob_files(store)) == 2
+    assert store.get(first) == "<html>same</html>"
+
+
+def test_latest_only_returns_each_sites_newest_snapshot(tmp_path):
+    store = PageStore(str(tmp_path / "store"), compression=None)
+    old = store.put("a.html", "2023-01-01", "<html>old</html>")
+    new = store.put("a.html", "2023-02-01", "<html>new</html>")
+    other = store.put("b.html", "2022-12-01", "<html>b</html>")
+
+    assert store.entries() == [("a.html", "2023-02-01", new), ("b.html", "2022-12-01", other)]
+    assert [entry[2] for entry in store.entries(latest_only=False)] == [old, new, other]
+
+
+def test_sites_sharing_a_blob_get_independent_records(tmp_path):
+    store = PageStore(str(tmp_path / "store"))
+    for site in ("a.html", "b.html", "c.html"):
+        store.put_file(SAMPLE_PAGE, site=site, snapshot_date="2023-01-01")
+
+    records = {record["filename"]: record for record in extract_records(page_store=store)}
+    assert sorted(records) == ["a.html", "b.html", "c.html"]
+    assert store.stats()["blobs"] == 1
+
+    expected = dict(copy.deepcopy(records["b.html"]), filename="c.html")
+    records["a.html"]["monthly_visits"].append({"month": "Jan", "visits": 1})
+    records["b.html"]["monthly_visits"].clear()
+    assert records["c.html"] == expected
@@ -0,0 +1,17 @@
+from etl.quality import QualityAggregator, read_quality
+
+
+def test_runs_started_together_keep_separate_counts(tmp_path):
+    db_path = str(tmp_path / "web_metrics.sqlite")
+    first, second = QualityAggregator(), QualityAggregator()
+    assert first.run_id != second.run_id
+
+    first.add({"global_rank": "present"})
+    second.add({"global_rank": "missing"})
+    first.flush(db_path)
+    second.flush(db_path)
+
+    assert read_quality(db_path, first.run_id)[0]["present"] == 1
+    assert read_quality(db_path, first.run_id)[0]["missing"] == 0
+    # The latest run is the one created last
+    assert read_quality(db_path)[0]["run_id"] == second.run_id
@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+
+from api.query_service import MAX_RANKING_N, MetricsQueryService, make_server
+from etl.load_to_db import DatabaseLoader
+from utils import error_logger
+
+
+def make_db(tmp_path, make_record):
+    db_path = str(tmp_path / "web_metrics.sqlite")
+    DatabaseLoader([make_record("a.html"), make_record("b.html")]).load_to_sqlite(db_path)
+    return db_path
+
+
+def test_external_commit_invalidates_cache_on_every_pooled_connection(tmp_path, make_record):
+    db_path = make_db(tmp_path, make_record)
+    service = MetricsQueryService(db_path, pool_size=4)
+    try:
+        assert {site["status"] for site in service.sites()} == {"complete"}
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE web_metrics SET status = 'partial' WHERE filename = 'a.html'")
+        conn.close()
+
+        # Each read may land on a connection that has never run a query before
+        for _ in range(4):
+            statuses = {site["site"]: site["status"] for site in service.sites()}
+            assert statuses["a.html"] == "partial"
+    finally:
+        service.close()
+
+
+def test_reload_through_loader_invalidates_cache(tmp_path, make_record):
+    db_path = make_db(tmp_path, make_record)
+    service = MetricsQueryService(db_path, pool_size=2)
+    try:
+        assert len(service.sites()) == 2
+        DatabaseLoader([make_record("c.html")]).upsert_to_sqlite(db_path)
+        assert [site["site"] for site in service.sites()] == ["a.html", "b.html", "c.html"]
+    finally:
+        service.close()
+
+
+def test_ranking_on_database_without_summary_tables(tmp_path, make_record):
+    db_path = make_db(tmp_path, make_record)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE site_growth")
+        conn.execute("DROP TABLE site_scores")
+    conn.close()
+
+    service = MetricsQueryService(db_path)
+    try:
+        # Both sites have the same series, so they tie for first place
+        assert {entry["site"] for entry in service.ranking(2)} == {"a.html", "b.html"}
+        assert service.rank("b.html")["rank"] == 1
+        assert service.rank("missing.html") is None
+    finally:
+        service.close()
+
+
+def get(server, path):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_http_status_codes_and_ranking_bounds(tmp_path, make_record):
+    db_path = str(tmp_path / "web_metrics.sqlite")
+    records = [make_record(f"{i:03d}.html") for i in range(MAX_RANKING_N + 5)]
+    DatabaseLoader(records).load_to_sqlite(db_path)
+
+    server = make_server(db_path, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert get(server, "/sites/000.html/series")[0] == 200
+        for path in ("/sites/missing.html", "/sites/missing.html/series", "/sites/missing.html/rank"):
+            assert get(server, path)[0] == 404
+
+        assert get(server, "/rankings/top?n=0")[0] == 400
+        assert get(server, "/rankings/bottom?n=-1")[0] == 400
+        assert get(server, "/rankings/top?n=abc")[0] == 400
+        status, body = get(server, f"/rankings/top?n={MAX_RANKING_N * 10}")
+        assert status == 200 and len(body) == MAX_RANKING_N
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.RequestHandlerClass.service.close()
+
+
+def test_database_errors_return_500(tmp_path, make_record, monkeypatch):
+    monkeypatch.setattr(error_logger, "LOG_PATH", str(tmp_path / "logs" / "error_log.csv"))
+    db_path = make_db(tmp_path, make_record)
+    server = make_server(db_path, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DROP TABLE web_metrics")
+        conn.close()
+
+        status, body = get(server, "/sites")
+        assert status == 500 and body == {"error": "Database error (OperationalError)"}
+        assert os.path.exists(error_logger.LOG_PATH)
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.RequestHandlerClass.service.close()
@@ -0,0 +1,40 @@
+import csv
+
+from main import save_to_csv
+from utils import series_codec
+
+TRICKY = [
+    [{"label": "Côte d'Ivoire", "value": 1.5}, {"label": 'say "hi"', "value": None}],
+    [{"month": "Nov", "visits": None}, {"month": "Dec", "visits": 2**40}],
+    [{"label": "x', 'y", "value": True}],
+    "__MISSING__",
+    [],
+    None,
+]
+
+
+def test_legacy_repr_decodes_exactly():
+    assert series_codec.decode_many([repr(value) for value in TRICKY[:-1]]) == TRICKY[:-1]
+    assert series_codec.decode_many(["not a literal", 3]) == ["not a literal", 3]
+
+
+def test_packed_columns_round_trip():
+    columns = {"rank_changes": TRICKY, "monthly_visits": list(reversed(TRICKY))}
+    assert series_codec.unpack_columns(series_codec.pack_columns(columns)) == columns
+
+
+def test_csv_reload_uses_the_packed_sidecar_only_when_it_matches(tmp_path, make_record):
+    csv_path = str(tmp_path / "data.csv")
+    records = [make_record("a.html", top_countries=TRICKY[0]), make_record("b.html", status="partial")]
+    save_to_csv(records, csv_path)
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    packed = series_codec.read_series_file(csv_path, len(rows))
+    for field in series_codec.NESTED_FIELDS:
+        assert packed[field] == [record[field] for record in records]
+        assert series_codec.decode_many(row[field] for row in rows) == packed[field]
+
+    # A CSV edited after saving no longer matches its sidecar
+    assert series_codec.read_series_file(csv_path, len(rows) + 1) is None
+    assert series_codec.read_series_file(str(tmp_path / "other.csv"), len(rows)) is None
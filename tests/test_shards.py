@@ -0,0 +1,63 @@
+import os
+import sqlite3
+
+import pytest
+
+from analysis.metrics_reader import MetricsReader
+from etl.shards import MAX_SHARDS, ShardedLoader, ShardedMetricsReader, compact_shards, reset_shards, shard_file, shard_for
+
+
+def test_reads_skip_shards_without_tables(tmp_path, make_record):
+    shard_dir = str(tmp_path / "shards")
+    ShardedLoader([make_record("a.html")], 4, max_workers=1).load_to_shards(shard_dir)
+
+    others = [shard for shard in range(4) if shard != shard_for("a.html", 4)]
+    # One shard file missing, one present but without any tables
+    os.remove(os.path.join(shard_dir, shard_file(others[0])))
+    os.remove(os.path.join(shard_dir, shard_file(others[1])))
+    sqlite3.connect(os.path.join(shard_dir, shard_file(others[1]))).close()
+
+    reader = ShardedMetricsReader(shard_dir)
+    assert [entry["site"] for entry in reader.read_top(10)] == ["a.html"]
+    assert [entry["site"] for entry in reader.read_top(10, bottom=True)] == ["a.html"]
+    assert reader.read_rank("a.html")["rank"] == 1
+    assert not os.path.exists(os.path.join(shard_dir, shard_file(others[0])))
+
+
+def test_compaction_does_not_replace_existing_output(tmp_path, make_record):
+    shard_dir = str(tmp_path / "shards")
+    ShardedLoader([make_record("a.html"), make_record("b.html")], 2, max_workers=1).load_to_shards(shard_dir)
+    output = tmp_path / "web_metrics.sqlite"
+    output.write_bytes(b"existing")
+
+    with pytest.raises(FileExistsError):
+        compact_shards(shard_dir, str(output))
+    assert output.read_bytes() == b"existing"
+
+    compact_shards(shard_dir, str(output), overwrite=True)
+    assert {entry["site"] for entry in MetricsReader(str(output)).read_ranking()} == {"a.html", "b.html"}
+
+
+def test_shard_count_is_bounded_by_the_attach_limit(tmp_path, make_record):
+    shard_dir = str(tmp_path / "shards")
+    with pytest.raises(ValueError):
+        ShardedLoader([make_record("a.html")], MAX_SHARDS + 2)
+    assert not os.path.exists(shard_dir)
+
+    ShardedLoader([make_record("a.html")], MAX_SHARDS, max_workers=1).load_to_shards(shard_dir)
+    assert [entry["site"] for entry in ShardedMetricsReader(shard_dir).read_ranking()] == ["a.html"]
+
+
+def test_reset_after_compaction_allows_another_shard_count(tmp_path, make_record):
+    shard_dir = str(tmp_path / "shards")
+    records = [make_record("a.html"), make_record("b.html")]
+    ShardedLoader(records, 2, max_workers=1).load_to_shards(shard_dir)
+    with pytest.raises(ValueError, match="--reset"):
+        ShardedLoader(records, 3, max_workers=1).load_to_shards(shard_dir)
+
+    compact_shards(shard_dir, str(tmp_path / "web_metrics.sqlite"))
+    reset_shards(shard_dir)
+    assert os.listdir(shard_dir) == []
+
+    ShardedLoader(records, 3, max_workers=1).load_to_shards(shard_dir)
+    assert {entry["site"] for entry in ShardedMetricsReader(shard_dir).read_ranking()} == {"a.html", "b.html"}
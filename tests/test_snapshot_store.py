@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from analysis.analyze_metrics import compute_growth
+from etl.snapshot_store import SnapshotStore, resolve_month_label
+
+
+def visits(report_month, *points):
+    return {"report_month": report_month, "monthly_visits": [{"month": m, "visits": v} for m, v in points]}
+
+
+def assert_matches_full_recompute(store, site="a.html"):
+    """The incrementally kept growth, aggregates and score equal a recompute over the stored series."""
+    with sqlite3.connect(store.db_path) as conn:
+        aggregates = {
+            row[0]: row[1:] for row in conn.execute(
+                "SELECT metric, point_count, growth_count, growth_sum, first_month, last_month "
+                "FROM series_aggregates WHERE site = ?", (site,)
+            )
+        }
+        score = conn.execute("SELECT score FROM snapshot_scores WHERE site = ?", (site,)).fetchone()[0]
+    conn.close()
+
+    averages = {}
+    for metric in ("visits", "rank"):
+        points = store.read_series(site, metric)
+        growth = compute_growth([point["value"] for point in points])
+        assert [point["growth"] for point in points[1:]] == growth
+        point_count, growth_count, growth_sum, first_month, last_month = aggregates[metric]
+        assert (point_count, growth_count) == (len(points), len(growth))
+        assert growth_sum == pytest.approx(sum(g or 0 for g in growth))
+        assert (first_month, last_month) == (points[0]["month"], points[-1]["month"])
+        averages[metric] = sum(g or 0 for g in growth) / len(growth) if growth else 0
+    assert score == round(averages["visits"] - averages["rank"], 2)
+
+
+def months(store, site="a.html"):
+    return [(point["month"], point["value"]) for point in store.read_series(site, "visits")]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "web_metrics.sqlite"))
+
+
+def test_month_inserted_before_existing_ones(store, make_record):
+    store.add_records([make_record("a.html", **visits("2022-12", ("Nov", 900), ("Dec", 1000)))])
+    store.add_records([make_record("a.html", **visits("2022-10", ("Sep", 600), ("Oct", 800)))])
+    assert months(store) == [("2022-09", 600), ("2022-10", 800), ("2022-11", 900), ("2022-12", 1000)]
+    assert_matches_full_recompute(store)
+
+
+def test_month_inserted_between_two(store, make_record):
+    store.add_records([make_record("a.html", **visits("2022-12", ("Oct", 800), ("Dec", 1000)))])
+    store.add_records([make_record("a.html", **visits("2022-11", ("Nov", 900)))])
+    assert months(store) == [("2022-10", 800), ("2022-11", 900), ("2022-12", 1000)]
+    assert_matches_full_recompute(store)
+
+
+def test_changed_value(store, make_record):
+    store.add_records([make_record("a.html", **visits("2022-12", ("Oct", 800), ("Nov", 900), ("Dec", 1000)))])
+    assert store.add_records([make_record("a.html", **visits("2022-12", ("Nov", 400)))]) == 1
+    assert months(store) == [("2022-10", 800), ("2022-11", 400), ("2022-12", 1000)]
+    assert_matches_full_recompute(store)
+
+
+def test_identical_reload_changes_nothing(store, make_record):
+    record = make_record("a.html", **visits("2022-12", ("Oct", 800), ("Nov", 900), ("Dec", 1000)))
+    store.add_records([record])
+    scores = store.read_scores()
+    assert store.add_records([record]) == 0
+    assert store.read_scores() == scores
+    assert_matches_full_recompute(store)
+
+
+def test_none_value(store, make_record):
+    store.add_records([make_record("a.html", **visits("2022-12", ("Oct", 800), ("Nov", None), ("Dec", 1000)))])
+    assert [point["growth"] for point in store.read_series("a.html", "visits")] == [None, None, None]
+    assert_matches_full_recompute(store)
+
+    # Filling the gap later gives both neighbours their growth back
+    store.add_records([make_record("a.html", **visits("2022-11", ("Nov", 900)))])
+    assert_matches_full_recompute(store)
+
+
+def test_labels_after_the_report_month_belong_to_the_previous_year(store, make_record):
+    assert resolve_month_label("Nov", "2023-01") == "2022-11"
+    assert resolve_month_label("Jan", "2023-01") == "2023-01"
+    assert resolve_month_label("Nov", "__MISSING__") is None
+
+    store.add_records([make_record("a.html", **visits("2023-01", ("Nov", 800), ("Dec", 900), ("Jan", 1000)))])
+    assert [month for month, _ in months(store)] == ["2022-11", "2022-12", "2023-01"]
+    assert_matches_full_recompute(store)
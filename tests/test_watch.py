@@ -0,0 +1,48 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from etl.watch import HtmlWatcher
+from utils import error_logger
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), "..", "data", "raw_html", "similarweb-google-com.html")
+
+
+@pytest.fixture
+def watch_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(error_logger, "LOG_PATH", str(tmp_path / "logs" / "error_log.csv"))
+    raw_html_dir = tmp_path / "raw_html"
+    raw_html_dir.mkdir()
+    shutil.copy(SAMPLE_PAGE, raw_html_dir / "good.html")
+    (raw_html_dir / "bad.html").write_bytes(b"<html>\xff\xfe</html>")
+    return str(raw_html_dir), str(tmp_path / "web_metrics.sqlite")
+
+
+def test_unreadable_files_are_logged_and_skipped(watch_dirs):
+    raw_html_dir, db_path = watch_dirs
+    watcher = HtmlWatcher(raw_html_dir, db_path, use_polling=True)
+    try:
+        watcher.process(["bad.html", "deleted.html", "good.html"])
+    finally:
+        watcher.source.close()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT filename FROM web_metrics").fetchall() == [("good.html",)]
+    conn.close()
+    assert os.path.exists(error_logger.LOG_PATH)
+
+
+def test_failed_write_leaves_batch_pending(watch_dirs, tmp_path):
+    raw_html_dir, _ = watch_dirs
+    # A directory cannot be opened as a database, so the write fails
+    unwritable = tmp_path / "not_a_db"
+    unwritable.mkdir()
+    watcher = HtmlWatcher(raw_html_dir, str(unwritable), use_polling=True)
+    try:
+        watcher.process(["good.html"])
+    finally:
+        watcher.source.close()
+
+    assert "good.html" in watcher.pending
@@ -5,7 +5,23 @@ import csv
 import os
 
 LOG_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "logs", "error_log.csv")
-os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+
+def log_exception(class_name: str, method_name: str, e: Exception) -> None:
+    """Logs the exception being handled to the CSV log and notifies in console."""
+    # Collect error metadata
+    timestamp = datetime.datetime.now().isoformat()
+    error_msg = str(e)
+    trace = traceback.format_exc()
+
+    # Notify in console (non-blocking)
+    print(f"An error occurred in {class_name}.{method_name}() — details logged.")
+
+    # Save error details to CSV log (directory created on first error, not at import)
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    with open(LOG_PATH, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([timestamp, class_name, method_name, error_msg, trace])
+
 
 def error_logger(func):
     """
@@ -17,20 +33,7 @@ def error_logger(func):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            # Collect error metadata
             class_name = args[0].__class__.__name__ if args else "UnknownClass"
-            method_name = func.__name__
-            timestamp = datetime.datetime.now().isoformat()
-            error_msg = str(e)
-            trace = traceback.format_exc()
-
-            # Notify in console (non-blocking)
-            print(f"An error occurred in {class_name}.{method_name}() — details logged.")
-
-            # Save error details to CSV log
-            with open(LOG_PATH, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow([timestamp, class_name, method_name, error_msg, trace])
-
+            log_exception(class_name, func.__name__, e)
             return "__MISSING__"
     return wrapper
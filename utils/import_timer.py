@@ -0,0 +1,69 @@
+import os
+import csv
+import sys
+import time
+import datetime
+import importlib
+import subprocess
+
+METRICS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "logs", "import_times.csv")
+
+# Subsystems imported on demand, measured individually by measure_cold_imports
+SUBSYSTEMS = [
+    "etl.extract_and_transform",
+    "etl.load_to_db",
+    "analysis.analyze_metrics",
+    "api.query_service",
+]
+
+
+def record_import_time(module_name: str, seconds: float, mode: str) -> None:
+    """Appends one import timing to the CSV metrics log (timestamp, module, mode, seconds)."""
+    os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+    with open(METRICS_PATH, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([datetime.datetime.now().isoformat(), module_name, mode, round(seconds, 4)])
+
+
+def timed_import(module_name: str):
+    """
+    Imports a subsystem on demand and records how long it took.
+    Modules that are already loaded are returned without recording anything.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    record_import_time(module_name, time.perf_counter() - start, mode="lazy")
+    return module
+
+
+def measure_cold_imports(modules: list[str] = None) -> dict:
+    """
+    Measures each module's import time in a fresh interpreter, so the numbers
+    are comparable between runs regardless of what the current process has loaded.
+    """
+    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    timings = {}
+    for module_name in modules or ["main"] + SUBSYSTEMS:
+        code = (
+            "import time; start = time.perf_counter(); "
+            f"import {module_name}; print(time.perf_counter() - start)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=root_dir, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"Could not import {module_name}: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        seconds = float(result.stdout.strip().splitlines()[-1])
+        record_import_time(module_name, seconds, mode="cold")
+        timings[module_name] = seconds
+    return timings
+
+
+if __name__ == "__main__":
+    for name, seconds in measure_cold_imports().items():
+        print(f"{name:<28} {seconds * 1000:8.1f} ms")
+    print(f"Recorded in {os.path.abspath(METRICS_PATH)}")
@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+import multiprocessing
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# Running tracemalloc peaks of the stages currently being tracked
+_active_stages = []
+
+
+def reset_traced_peak() -> None:
+    """Resets tracemalloc's peak without losing it for the stages currently being tracked."""
+    _, peak = tracemalloc.get_traced_memory()
+    for state in _active_stages:
+        state["peak"] = max(state["peak"], peak)
+    tracemalloc.reset_peak()
+
+
+def untraced_worker() -> None:
+    """
+    Process pool initializer. Forked workers inherit tracemalloc from a traced parent, which slows
+    every allocation they make while nothing reads their traces; their memory is measured as RSS.
+    """
+    tracemalloc.stop()
+
+
+def _peak_rss(who) -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def process_rss(pid="self") -> int:
+    """Resident set size of a process in bytes from /proc, or 0 where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is not available)."""
+    return process_rss() or _peak_rss(resource.RUSAGE_SELF if resource else None)
+
+
+def worker_rss() -> list[int]:
+    """
+    RSS of each live multiprocessing child (e.g. ProcessPoolExecutor workers). Where /proc is not
+    available, the peak RSS of the largest finished child is the best that can be reported.
+    """
+    sizes = [process_rss(child.pid) for child in multiprocessing.active_children()]
+    if sizes and not any(sizes):
+        return [_peak_rss(resource.RUSAGE_CHILDREN if resource else None)]
+    return sizes
+
+
+def total_rss() -> int:
+    """RSS of this process plus its worker processes."""
+    return current_rss() + sum(worker_rss())
+
+
+class MemoryTracker:
+    """
+    Records per-stage peak memory: Python allocations through tracemalloc and RSS of this
+    process plus its worker processes, sampled on a background thread while the stage runs.
+    """
+
+    def __init__(self, sample_interval: float = 0.05):
+        self.sample_interval = sample_interval
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        reset_traced_peak()
+        start_traced = tracemalloc.get_traced_memory()[0]
+        start_rss = total_rss()
+        state = {"peak": 0}
+        _active_stages.append(state)
+
+        rss_peak = [start_rss]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(self.sample_interval):
+                rss_peak[0] = max(rss_peak[0], total_rss())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            _active_stages.remove(state)
+            traced_peak = max(state["peak"], tracemalloc.get_traced_memory()[1])
+            rss_peak[0] = max(rss_peak[0], total_rss())
+            previous = self.stages.get(name, {})
+            self.stages[name] = {
+                "python_peak": max(previous.get("python_peak", 0), traced_peak - start_traced),
+                "rss_start": previous.get("rss_start", start_rss),
+                "rss_peak": max(previous.get("rss_peak", 0), rss_peak[0]),
+                "seconds": previous.get("seconds", 0) + time.perf_counter() - started_at,
+            }
+
+    def report(self) -> None:
+        if not self.stages:
+            return
+        print("\nPeak memory by stage (RSS includes worker processes):")
+        print(f"  {'stage':<12} {'python peak':>12} {'rss start':>10} {'rss peak':>10} {'time':>8}")
+        for name, stats in self.stages.items():
+            print(
+                f"  {name:<12} {stats['python_peak'] / MB:>9.1f} MB {stats['rss_start'] / MB:>7.1f} MB"
+                f" {stats['rss_peak'] / MB:>7.1f} MB {stats['seconds']:>7.2f}s"
+            )
+
+
+class MemoryBudget:
+    """
+    Plans batch size and worker count so the run, worker processes included, stays under `limit_mb`.
+    The cost of one page is learned from pages parsed in-process. A worker process is assumed to
+    cost as much as this process does once the parser is loaded, until live workers can be measured.
+    Batches shrink as headroom runs out, so the plan is re-checked more often near the limit.
+    """
+
+    def __init__(self, limit_mb: float, max_workers: int = None, max_batch: int = 64):
+        self.limit = int(limit_mb * MB)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.per_page = None
+        self.per_worker = None
+        self.warned = False
+
+    def observe(self, peak_bytes: int) -> None:
+        """Updates the per-page cost from the peak allocation measured while one page was parsed."""
+        self.per_page = max(self.per_page or 0, peak_bytes)
+
+    def observe_workers(self) -> None:
+        """Updates the per-worker cost from the RSS of the live worker processes."""
+        sizes = worker_rss()
+        if sizes:
+            self.per_worker = max(self.per_worker or 0, max(sizes))
+
+    def headroom(self) -> int:
+        return max(0, self.limit - total_rss())
+
+    def _warn(self, needed: int) -> None:
+        if not self.warned:
+            print(
+                f"Warning: the {self.limit // MB} MB memory budget is below what one page in one process "
+                f"needs (~{needed / MB:.0f} MB); continuing one page at a time."
+            )
+            self.warned = True
+
+    def plan(self) -> tuple[int, int]:
+        """
+        Returns (batch_size, workers). Until a page has been measured, processes one page in-process.
+        workers == 1 means in-process; more workers run in a pool next to this process.
+        """
+        parent = current_rss()
+        if self.per_page is None:
+            if parent > self.limit:
+                self._warn(parent)
+            return 1, 1
+
+        if parent + self.per_page > self.limit:
+            self._warn(parent + self.per_page)
+            return 1, 1
+
+        # Workers are re-planned as a whole, so only this process counts as already spent
+        per_worker = max(self.per_worker or 0, parent + self.per_page)
+        workers = int((self.limit - parent) // per_worker)
+        workers = max(1, min(self.max_workers, workers))
+
+        if workers == 1:
+            remaining = self.limit - parent
+        else:
+            remaining = self.limit - parent - workers * per_worker
+        batch_size = int(remaining // self.per_page) if self.per_page else self.max_batch
+        batch_size = max(1, min(self.max_batch, batch_size))
+        if workers > 1:
+            # Each worker holds one page at a time; a batch smaller than the pool leaves workers idle
+            batch_size = max(batch_size, workers)
+        return batch_size, workers
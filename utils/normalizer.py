@@ -1,4 +1,5 @@
 import re
+from datetime import datetime
 from typing import Optional
 
 class Normalizer:
@@ -83,6 +84,22 @@ class Normalizer:
         except ValueError:
             return None
 
+    @staticmethod
+    def normalize_month(value: str) -> Optional[str]:
+        """
+        Converts 'December 2022' (or 'Dec 2022') to '2022-12'
+        """
+        if value == "__MISSING__":
+            return "__MISSING__"
+        if not value:
+            return None
+        for fmt in ("%B %Y", "%b %Y"):
+            try:
+                return datetime.strptime(value.strip(), fmt).strftime("%Y-%m")
+            except ValueError:
+                continue
+        return None
+
     @staticmethod
     def normalize_list_field(data: list[dict], key: str, steps: list) -> list[dict]:
         """
@@ -111,3 +128,4 @@ if __name__ == "__main__":
     print("normalize_duration: ", Normalizer.normalize_duration("00:03:16"))
     print("handle_missing: ", Normalizer.handle_missing("--"))
     print("normalize_rank: ", Normalizer.normalize_rank("#7,435"))
+    print("normalize_month: ", Normalizer.normalize_month("December 2022"))
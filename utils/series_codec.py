@@ -0,0 +1,319 @@
+import os
+import ast
+import sys
+import json
+import struct
+from array import array
+from typing import Optional
+
+# Fields holding lists of {label: value} points, shared by the CSV sink, the SQLite loader and the analysis
+NESTED_FIELDS = ("rank_changes", "monthly_visits", "top_countries", "age_distribution")
+
+PACKED_MAGIC = b"SRC1"
+COLUMNS_MAGIC = b"SRS1"
+LENGTH = struct.Struct("<I")
+NOT_A_LIST = 0xFFFFFFFF
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_decode_json = json.JSONDecoder().decode
+
+
+def encode(value) -> str:
+    """Encodes a nested value as compact JSON text."""
+    return _encoder.encode(value)
+
+
+def _decode_repr(text: str):
+    """
+    Decodes Python repr text (what older versions wrote to CSV). Swapping the quotes and literals
+    makes most of it JSON, which parses far faster than ast.literal_eval; that result is only kept if
+    it reprs back to the same text, so strings such as "Côte d'Ivoire" still go through literal_eval.
+    Raises ValueError or SyntaxError when the text is not a Python literal either.
+    """
+    candidate = text.replace("'", '"').replace("None", "null").replace("True", "true").replace("False", "false")
+    try:
+        value = _decode_json(candidate)
+        if repr(value) == text:
+            return value
+    except ValueError:
+        pass
+    return ast.literal_eval(text)
+
+
+def decode(value):
+    """
+    Decodes JSON text back into Python values. Non-string values are returned unchanged.
+    Text written by older versions as Python repr (e.g. "[{'month': 'Oct', ...}]") is read as a
+    Python literal, so apostrophes and None survive. Text that is neither is returned as-is.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return _decode_json(value)
+    except ValueError:
+        pass
+    try:
+        return _decode_repr(value)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return value
+
+
+def encode_many(values) -> list[str]:
+    encode_one = _encoder.encode
+    return [encode_one(value) for value in values]
+
+
+def decode_many(values) -> list:
+    decoded = []
+    append = decoded.append
+    for value in values:
+        if isinstance(value, str):
+            try:
+                append(_decode_json(value))
+                continue
+            except ValueError:
+                pass
+            try:
+                append(_decode_repr(value))
+            except (ValueError, SyntaxError, MemoryError, RecursionError):
+                append(value)
+            continue
+        append(value)
+    return decoded
+
+
+def encode_record(record: dict) -> dict:
+    """Returns a copy of a record with its nested fields encoded as JSON text."""
+    encoded = dict(record)
+    for field in NESTED_FIELDS:
+        if field in encoded:
+            encoded[field] = encode(encoded[field])
+    return encoded
+
+
+def _column_type(values) -> str:
+    """Picks the packed type for one key: int64, float64, string or JSON fallback."""
+    present = [v for v in values if v is not None]
+    if all(type(v) is int for v in present) and all(-2**63 <= v < 2**63 for v in present):
+        return "q"
+    if all(type(v) is float for v in present):
+        return "d"
+    if all(type(v) is str and "\x00" not in v for v in present):
+        return "s"
+    return "j"
+
+
+def pack_many(values) -> bytes:
+    """
+    Packs a column of series into one columnar binary blob.
+    Lists whose items are all dicts with the same keys are stored key by key as typed arrays;
+    any other value (e.g. '__MISSING__') is kept as JSON, so every value round-trips exactly.
+    """
+    lengths = array("I")
+    others = []
+    keys = None
+    points = []
+    for value in values:
+        if isinstance(value, list) and all(isinstance(item, dict) for item in value):
+            if value and keys is None:
+                keys = list(value[0].keys())
+            if all(list(item.keys()) == keys for item in value):
+                lengths.append(len(value))
+                points.extend(value)
+                continue
+        lengths.append(NOT_A_LIST)
+        others.append(value)
+
+    sections = [lengths.tobytes(), encode(others).encode("utf-8")]
+    columns = []
+    for key in keys or []:
+        column = [point[key] for point in points]
+        col_type = _column_type(column)
+        has_nulls = col_type != "j" and any(v is None for v in column)
+
+        if col_type == "q":
+            data = array("q", [0 if v is None else v for v in column]).tobytes()
+        elif col_type == "d":
+            data = array("d", [0.0 if v is None else v for v in column]).tobytes()
+        elif col_type == "s":
+            data = "\x00".join("" if v is None else v for v in column).encode("utf-8")
+        else:
+            data = encode(column).encode("utf-8")
+
+        sections.append(data)
+        if has_nulls:
+            sections.append(bytes(v is None for v in column))
+        columns.append([key, col_type, has_nulls])
+
+    header = encode({
+        "byteorder": sys.byteorder,
+        "columns": columns,
+        "sections": [len(section) for section in sections],
+    }).encode("utf-8")
+    return b"".join([PACKED_MAGIC, LENGTH.pack(len(header)), header] + sections)
+
+
+def unpack_many(blob: bytes) -> list:
+    """Inverse of pack_many."""
+    if blob[:4] != PACKED_MAGIC:
+        raise ValueError("Not a packed series blob")
+    header_len = LENGTH.unpack_from(blob, 4)[0]
+    offset = 8 + header_len
+    header = json.loads(blob[8:offset])
+    swap = header["byteorder"] != sys.byteorder
+
+    sections = []
+    for size in header["sections"]:
+        sections.append(blob[offset:offset + size])
+        offset += size
+    sections.reverse()
+
+    lengths = array("I")
+    lengths.frombytes(sections.pop())
+    if swap:
+        lengths.byteswap()
+    others = iter(json.loads(sections.pop()))
+
+    keys = []
+    columns = []
+    for key, col_type, has_nulls in header["columns"]:
+        data = sections.pop()
+        if col_type in ("q", "d"):
+            column = array(col_type)
+            column.frombytes(data)
+            if swap:
+                column.byteswap()
+        elif col_type == "s":
+            column = data.decode("utf-8").split("\x00")
+        else:
+            column = json.loads(data)
+        if has_nulls:
+            column = [None if null else v for v, null in zip(column, sections.pop())]
+        keys.append(key)
+        columns.append(column)
+
+    if len(keys) == 2:
+        # The common shape ({label: ..., value: ...}) avoids the generic zip(keys, row) per point
+        first, second = keys
+        points = [{first: a, second: b} for a, b in zip(*columns)]
+    else:
+        points = [dict(zip(keys, row)) for row in zip(*columns)]
+
+    values = []
+    position = 0
+    for length in lengths:
+        if length == NOT_A_LIST:
+            values.append(next(others))
+        else:
+            values.append(points[position:position + length])
+            position += length
+    return values
+
+
+def pack(value) -> bytes:
+    return pack_many([value])
+
+
+def unpack(blob: bytes):
+    return unpack_many(blob)[0]
+
+
+def pack_columns(columns: dict) -> bytes:
+    """Packs several named columns ({field: values}) into one blob, each column with pack_many."""
+    blobs = [(name, pack_many(values)) for name, values in columns.items()]
+    header = encode([[name, len(blob)] for name, blob in blobs]).encode("utf-8")
+    return b"".join([COLUMNS_MAGIC, LENGTH.pack(len(header)), header] + [blob for _, blob in blobs])
+
+
+def unpack_columns(blob: bytes) -> dict:
+    """Inverse of pack_columns."""
+    if blob[:4] != COLUMNS_MAGIC:
+        raise ValueError("Not a packed series file")
+    offset = 8 + LENGTH.unpack_from(blob, 4)[0]
+    columns = {}
+    for name, size in json.loads(blob[8:offset]):
+        columns[name] = unpack_many(blob[offset:offset + size])
+        offset += size
+    return columns
+
+
+def series_path(csv_path: str) -> str:
+    """Packed sidecar written next to a CSV, holding its nested fields for a fast, exact reload."""
+    return os.path.splitext(csv_path)[0] + ".series"
+
+
+def write_series_file(records: list[dict], csv_path: str) -> None:
+    columns = {field: [record.get(field) for record in records] for field in NESTED_FIELDS if field in records[0]}
+    with open(series_path(csv_path), "wb") as f:
+        f.write(pack_columns(columns))
+
+
+def read_series_file(csv_path: str, rows: int) -> Optional[dict]:
+    """
+    Returns the nested fields stored next to a CSV as {field: values}, or None when there is no
+    sidecar or it does not hold `rows` rows (e.g. the CSV was edited), so the CSV text is decoded instead.
+    """
+    try:
+        with open(series_path(csv_path), "rb") as f:
+            columns = unpack_columns(f.read())
+    except (OSError, ValueError):
+        return None
+    if any(len(values) != rows for values in columns.values()):
+        return None
+    return columns
+
+
+if __name__ == "__main__":
+    # Benchmark: reloading the monthly_visits column of a saved CSV through each path
+    import timeit
+    import tempfile
+
+    rows = 20_000
+    values = [
+        [
+            {"month": "Oct", "visits": 10_500_000 + i},
+            {"month": "Nov", "visits": 10_500_000},
+            {"month": "Dec", "visits": None if i % 7 == 0 else 9_100_000},
+        ]
+        for i in range(rows)
+    ]
+    values[0] = "__MISSING__"
+
+    csv_repr = [repr(v) for v in values]       # what df.to_csv wrote
+    codec_json = encode_many(values)           # what save_to_csv writes now
+
+    def legacy_parse_json_column(column):
+        if isinstance(column, str):
+            try:
+                return json.loads(column.replace("'", '"'))
+            except Exception:
+                return []
+        return column
+
+    apostrophe = [{"label": "Côte d'Ivoire", "value": 1.5}]
+    assert decode(repr(apostrophe)) == apostrophe and legacy_parse_json_column(repr(apostrophe)) == []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "data.csv")
+        write_series_file([{"monthly_visits": value} for value in values], csv_path)
+
+        assert decode_many(codec_json) == values
+        assert decode_many(csv_repr) == values
+        assert read_series_file(csv_path, rows)["monthly_visits"] == values
+
+        paths = {
+            "legacy CSV repr, replace hack (lossy)": lambda: [legacy_parse_json_column(v) for v in csv_repr],
+            "legacy CSV repr, literal_eval (exact)": lambda: [ast.literal_eval(v) for v in csv_repr[1:]],
+            "legacy CSV repr, decode_many (exact)": lambda: decode_many(csv_repr),
+            "CSV JSON text, decode_many": lambda: decode_many(codec_json),
+            "packed .series file, read_series_file": lambda: read_series_file(csv_path, rows),
+        }
+        timings = {name: min(timeit.repeat(fn, number=1, repeat=5)) for name, fn in paths.items()}
+        packed_size = os.path.getsize(series_path(csv_path))
+
+    # The reload path before the codec existed
+    baseline = timings["legacy CSV repr, replace hack (lossy)"]
+    print(f"Decoding {rows} series (lower is better):")
+    for name, seconds in timings.items():
+        print(f"  {name:<40} {seconds * 1000:8.1f} ms  {rows / seconds:>12,.0f} rows/s  x{baseline / seconds:5.1f}")
+    print(f"Sizes: repr {sum(map(len, csv_repr)):,} B, JSON {sum(map(len, codec_json)):,} B, packed {packed_size:,} B")